@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import os
+from typing import Literal
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.exports import EXPORT_FORMATS, stream_export
+from src.qa_storage import COLUMNS, create_storage
+from src.session import SessionStore
+
+
+class ChatRequest(BaseModel):
+    question: str
+    session_id: str | None = None
+    # Os mesmos valores de RESPONSE_MODES, no LLMHandler; outros valores são recusados com 422
+    mode: Literal["single_pass", "two_step"] | None = None
+
+
+class BatchRequest(BaseModel):
+    items: list[ChatRequest] = Field(min_length=1)
+    max_concurrency: int = Field(default=8, ge=1, le=64)
+
+
+def serialize_sources(source_docs):
+    return [
+        {
+            "ID": doc.metadata.get("ID"),
+            "Pergunta": doc.metadata.get("Pergunta"),
+            "Resposta": doc.page_content,
+        }
+        for doc in source_docs
+    ]
+
+
+def create_app(llm_handler=None, session_store=None, storage=None):
+    """Cria a API HTTP; sem handler explícito usa o mesmo LLMHandler compartilhado do Streamlit."""
+    if llm_handler is None:
+        from src.resources import get_llm_handler
+
+        llm_handler = get_llm_handler()
+    if os.getenv("WARMUP_ON_START", "1") != "0":
+        llm_handler.warm_up()
+    session_store = session_store or SessionStore(memory_factory=llm_handler.create_memory)
+    storage = storage or create_storage(os.getenv("QA_DATABASE_PATH", "qa_database.json"))
+    app = FastAPI(title="Chatbot RH - Gemini e BlueShift")
+
+    async def answer(request):
+        session = session_store.get(request.session_id)
+        usage = {}
+        # Perguntas da mesma sessão são respondidas em ordem para manter o histórico coerente
+        async with session.lock:
+            response, source_docs = await llm_handler.run_on_loop(
+                llm_handler.agenerate_response(
+                    request.question, session.memory, mode=request.mode, usage=usage
+                )
+            )
+        return {
+            "session_id": session.session_id,
+            "answer": response,
+            "sources": serialize_sources(source_docs),
+            "usage": usage,
+        }
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "sessions": len(session_store)}
+
+    @app.post("/chat")
+    async def chat(request: ChatRequest):
+        return await answer(request)
+
+    @app.post("/chat/batch")
+    async def chat_batch(request: BatchRequest):
+        semaphore = asyncio.Semaphore(request.max_concurrency)
+
+        async def run(item):
+            async with semaphore:
+                try:
+                    return await answer(item)
+                except Exception as e:
+                    return {"session_id": item.session_id, "error": str(e)}
+
+        return {"results": await asyncio.gather(*(run(item) for item in request.items))}
+
+    @app.get("/export/{export_format}")
+    def export(export_format: str):
+        """Exporta a base de Perguntas e Respostas em blocos, sem montar o arquivo inteiro na memória."""
+        if export_format not in EXPORT_FORMATS:
+            raise HTTPException(status_code=404, detail=f"Formato desconhecido: {export_format}")
+        return StreamingResponse(
+            stream_export(storage.iter_records(), export_format, columns=COLUMNS),
+            media_type=EXPORT_FORMATS[export_format][1],
+            headers={"Content-Disposition": f'attachment; filename="qa_database.{export_format}"'},
+        )
+
+    @app.delete("/sessions/{session_id}")
+    async def delete_session(session_id: str):
+        return {"deleted": session_store.delete(session_id)}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="API HTTP do Chatbot RH.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--fake", action="store_true", help="Usa modelo e embeddings locais (sem Gemini).")
+    parser.add_argument("--fake-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.fake:
+        from src.fakes import create_fake_handler
+
+        handler = create_fake_handler(latency_seconds=args.fake_latency)
+    else:
+        handler = None
+    uvicorn.run(create_app(handler), host=args.host, port=args.port)
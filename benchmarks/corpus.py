@@ -0,0 +1,48 @@
+import random
+
+import pandas as pd
+
+TOPICS = [
+    "férias", "PLR", "vale refeição", "vale transporte", "plano de saúde", "home office",
+    "horas adicionais", "Portal do Fornecedor", "reembolso", "treinamento", "certificação",
+    "avaliação de desempenho", "promoção", "licença maternidade", "licença paternidade",
+    "banco de horas", "ponto eletrônico", "notebook", "VPN", "benefícios", "aniversário",
+    "onboarding", "desligamento", "atestado médico", "seguro de vida", "Gympass",
+]
+QUESTION_TEMPLATES = [
+    "Como solicitar {topic}?", "Qual a regra de {topic}?", "Quem aprova {topic}?",
+    "Onde consulto informações sobre {topic}?", "Qual o prazo para {topic}?",
+]
+FILLER = (
+    "o colaborador deve registrar a solicitação com antecedência mínima e aguardar a aprovação "
+    "do gestor responsável pela área conforme a política vigente da empresa e as normas do cliente"
+).split()
+
+
+def make_corpus(size, seed=42):
+    """Gera um DataFrame sintético no mesmo formato do qa_database.json."""
+    rng = random.Random(seed)
+    rows = []
+    for index in range(1, size + 1):
+        topic = rng.choice(TOPICS)
+        question = rng.choice(QUESTION_TEMPLATES).format(topic=topic)
+        answer_words = rng.sample(FILLER, k=min(len(FILLER), rng.randint(12, len(FILLER))))
+        rows.append({
+            "ID": index,
+            "Pergunta": f"{question} (#{index})",
+            "Resposta": f"Sobre {topic}: " + " ".join(answer_words) + f". Referência {index}.",
+            "Versão": 1,
+            "Status": "Ativo" if rng.random() > 0.05 else "Inativo",
+            "Data de criação": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2020, 2024)}",
+        })
+    return pd.DataFrame(rows)
+
+
+def make_queries(count, seed=7):
+    """Perguntas livres que não coincidem com as curadas, para exercitar o caminho com LLM."""
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(['oi', 'bom dia', 'olá'])}, {rng.choice(QUESTION_TEMPLATES).format(topic=rng.choice(TOPICS)).lower()} "
+        f"{' '.join(rng.sample(FILLER, k=4))} {index}"
+        for index in range(count)
+    ]
@@ -0,0 +1,219 @@
+import argparse
+import datetime
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.corpus import make_corpus, make_queries
+from functions.db_functions import update_vector_database
+from functions.function_app import apply_filters, evaluate_responses
+from src.fakes import create_fake_handler, discard_fake_handler
+from src.qa_database_handler import QADatabaseHandler
+from src.qa_filters import QuestionNgramIndex, add_filter_columns
+from src.tracing import tracer
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+
+def measure(function, repeat=1, setup=None):
+    """Executa a função e devolve latências (ms), vazão e pico de memória."""
+    durations = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    # Pico de memória medido em uma execução extra, para não distorcer as latências
+    if setup:
+        setup()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations = np.array(durations)
+    return {
+        "runs": repeat,
+        "p50_ms": float(np.percentile(durations, 50)),
+        "p95_ms": float(np.percentile(durations, 95)),
+        "p99_ms": float(np.percentile(durations, 99)),
+        "throughput_per_s": float(repeat / (durations.sum() / 1000)) if durations.sum() else None,
+        "peak_memory_mb": peak / 1024 / 1024,
+    }
+
+
+def bench_vector_sync(df, results):
+    state = {}
+
+    def reset():
+        # Cada execução parte de um diretório novo; o da execução anterior é apagado
+        if "handler" in state:
+            discard_fake_handler(state["handler"])
+        state["handler"] = create_fake_handler(df=df.iloc[:0])
+
+    def sync(frame):
+        def run_sync():
+            handler = state["handler"]
+            update_vector_database(
+                handler.vectorstore,
+                frame,
+                manifest_path=os.path.join(handler.persist_directory, "vector_manifest.sqlite3"),
+                lexical_index=handler.lexical_index,
+                question_store=handler.question_store,
+            )
+        return run_sync
+
+    # Indexação completa parte sempre de uma base vazia
+    results["update_vector_database.full"] = measure(sync(df), setup=reset)
+    results["update_vector_database.noop"] = measure(sync(df), repeat=3)
+
+    edited = df.iloc[[0]].copy()
+    counter = {"version": 1}
+
+    def edit_one():
+        counter["version"] += 1
+        edited["Versão"] = counter["version"]
+        sync(edited)()
+
+    results["update_vector_database.single_edit"] = measure(edit_one, repeat=20)
+    return state["handler"]
+
+
+def bench_responses(handler, df, query_count, results):
+    # Em corpus pequenos as perguntas se repetem; com cycle o iterador não se esgota antes das execuções
+    queries = itertools.cycle(make_queries(query_count * 4))
+    questions = itertools.cycle(df["Pergunta"].tolist())
+    memory = handler.create_memory("buffer")
+
+    results["generate_response.rag"] = measure(
+        lambda: handler.generate_response(next(queries), memory), repeat=query_count
+    )
+    results["generate_response.curated"] = measure(
+        lambda: handler.generate_response(next(questions), memory), repeat=query_count
+    )
+    batch = make_queries(query_count, seed=11)
+    results["test_performance.batch"] = measure(
+        lambda: handler.test_performance(batch, max_workers=8), repeat=3
+    )
+
+    sample = df.sample(n=min(len(df), 1000), random_state=0)
+    generated = make_queries(len(sample), seed=13)
+    results["evaluate_responses.semantic"] = measure(
+        lambda: evaluate_responses(sample["Resposta"], generated, embeddings=handler.embeddings), repeat=3
+    )
+
+
+def bench_storage(df, results):
+    with tempfile.TemporaryDirectory(prefix="chatbot-bench-") as directory:
+        for backend, file_name in (("json", "qa.json"), ("sqlite", "qa.sqlite3")):
+            db_handler = QADatabaseHandler(os.path.join(directory, file_name))
+
+            def load():
+                db_handler.load_data.clear()
+                db_handler.load_data()
+
+            results[f"save_data.{backend}"] = measure(lambda: db_handler.save_data(df, sync_vectors=False), repeat=3)
+            results[f"load_data.{backend}"] = measure(load, repeat=3)
+            row = df.iloc[0].to_dict()
+            results[f"upsert_row.{backend}"] = measure(
+                lambda: db_handler.upsert_row(row, sync_vectors=False), repeat=20
+            )
+
+
+def bench_filters(df, results):
+    data = add_filter_columns(df.copy())
+    question_index = QuestionNgramIndex.from_frame(data)
+    start, end = datetime.date(2021, 1, 1), datetime.date(2023, 12, 31)
+    results["apply_filters.scan"] = measure(
+        lambda: apply_filters(data, ["Ativo"], "férias", start, end), repeat=20
+    )
+    results["apply_filters.ngram_index"] = measure(
+        lambda: apply_filters(data, ["Ativo"], "férias", start, end, question_index=question_index), repeat=20
+    )
+
+
+def run(sizes, query_count, latency):
+    tracer.log_enabled = False
+    report = {}
+    for size in sizes:
+        print(f"Corpus com {size} linhas...", file=sys.stderr)
+        df = make_corpus(size)
+        results = {}
+        handler = bench_vector_sync(df, results)
+        handler.llm.latency_seconds = latency
+        bench_responses(handler, df, query_count, results)
+        discard_fake_handler(handler)
+        bench_storage(df, results)
+        bench_filters(df, results)
+        report[str(size)] = results
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Lista as métricas cujo p50 piorou além da tolerância em relação à baseline."""
+    regressions = []
+    for size, results in report.items():
+        for name, metrics in results.items():
+            reference = baseline.get(size, {}).get(name)
+            if reference and reference["p50_ms"] and metrics["p50_ms"] > reference["p50_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{size}/{name}: p50 {metrics['p50_ms']:.1f} ms (baseline {reference['p50_ms']:.1f} ms)"
+                )
+    return regressions
+
+
+def print_report(report):
+    header = f"{'linhas':>8}  {'benchmark':<36}{'p50 ms':>10}{'p95 ms':>10}{'ops/s':>10}{'pico MB':>10}"
+    print(header)
+    print("-" * len(header))
+    for size, results in report.items():
+        for name, metrics in results.items():
+            throughput = metrics["throughput_per_s"] or 0
+            print(
+                f"{size:>8}  {name:<36}{metrics['p50_ms']:>10.1f}{metrics['p95_ms']:>10.1f}"
+                f"{throughput:>10.1f}{metrics['peak_memory_mb']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks offline com Gemini e embeddings falsos.")
+    parser.add_argument("--sizes", default="10,10000,100000", help="Tamanhos do corpus, separados por vírgula.")
+    parser.add_argument("--queries", type=int, default=50, help="Perguntas por benchmark de resposta.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência simulada do modelo, em segundos.")
+    parser.add_argument("--output", help="Grava o relatório em JSON neste caminho.")
+    parser.add_argument("--save-baseline", action="store_true", help="Atualiza benchmarks/baselines.json.")
+    parser.add_argument("--compare", action="store_true", help="Compara com benchmarks/baselines.json.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Piora relativa aceita no p50.")
+    args = parser.parse_args()
+
+    os.environ.setdefault("TRACE_LOG", "0")
+    report = run([int(size) for size in args.sizes.split(",")], args.queries, args.latency)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(report)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+
+    if args.compare:
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO {regression}")
+        sys.exit(1 if regressions else 0)
@@ -1,61 +1,116 @@
+import hashlib
+import json
 import os
+import threading
+import uuid
 
-import google.auth
-from dotenv import load_dotenv
-from google.cloud import secretmanager
 from langchain.schema import Document
 
-from src.llm_handler import LLMHandler
-from src.secret_manager import SecretManager
+from src.resources import get_vectorstore
+from src.response_cache import normalize_id
+from src.tracing import tracer
+from src.vector_manifest import VectorManifest
 
+MANIFEST_PATH = os.path.join("chroma_db", "vector_manifest.sqlite3")
+BATCH_SIZE = 1000
+_manifests = {}
+_manifests_lock = threading.Lock()
 
-def get_api_key():
-    credentials, project = google.auth.default()
-    client = secretmanager.SecretManagerServiceClient(credentials=credentials)
-    secret_manager = SecretManager(project=project, client=client)
 
-    api_key = secret_manager.access_secret_version("GEMINI_API_KEY")
+def initialize_db():
+    return get_vectorstore()
+
+
+def _normalize_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def compute_row_hash(answer, metadata):
+    """Gera o hash do conteúdo indexado de uma Pergunta e Resposta."""
+    payload = [answer] + [
+        _normalize_value(metadata.get(field))
+        for field in ("Pergunta", "Versão", "Status", "Data de criação")
+    ]
+    return hashlib.sha256(
+        json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def load_manifest(db, manifest_path=MANIFEST_PATH):
+    """Abre o manifesto ID -> (id no Chroma, hash, versão) uma vez por processo, criando-o a partir do Chroma se vazio."""
+    with _manifests_lock:
+        manifest = _manifests.get(manifest_path)
+        if manifest is None:
+            manifest = VectorManifest(manifest_path)
+            with manifest.locked():
+                if not len(manifest):
+                    existing_docs = db.get(include=["metadatas", "documents"])
+                    manifest.apply({
+                        normalize_id(metadata.get("ID")): {
+                            "chroma_id": doc_id,
+                            "hash": compute_row_hash(doc, metadata),
+                            "version": _normalize_value(metadata.get("Versão")),
+                        }
+                        for doc_id, metadata, doc in zip(
+                            existing_docs["ids"], existing_docs["metadatas"], existing_docs["documents"]
+                        )
+                    })
+            _manifests[manifest_path] = manifest
+    return manifest
+
+
+def delete_from_vector_database(db, unique_id, manifest_path=MANIFEST_PATH, lexical_index=None, question_store=None):
+    """Remove uma Pergunta e Resposta do Chroma pelo manifesto ou pelo filtro de metadados."""
+    key = normalize_id(unique_id)
+    manifest = load_manifest(db, manifest_path)
+    with manifest.locked():
+        entry = manifest.get(key)
+        for store in filter(None, (db, question_store)):
+            if entry:
+                store.delete([entry["chroma_id"]])
+            else:
+                store._collection.delete(where={"ID": _normalize_value(unique_id)})
+        manifest.apply(removed=[key])
 
-    if api_key is None:
-        print(
-            "Chave API não encontrada no Secret Manager. Tentando carregar do .env..."
-        )
-        load_dotenv()
-        api_key = os.getenv("GEMINI_API_KEY")
+    if lexical_index is not None and lexical_index.remove(key):
+        lexical_index.save()
+    return {key}
 
-    if api_key is None:
-        raise ValueError(
-            "Não foi possível obter a chave API do Gemini. Verifique o Secret Manager ou o arquivo .env."
-        )
 
-    return api_key
+def update_vector_database(db, df, manifest_path=MANIFEST_PATH, lexical_index=None, question_store=None):
+    """Sincroniza o Chroma (e os índices de perguntas e BM25, se informados) com o DataFrame e retorna os IDs alterados."""
+    with tracer.span("vector_sync", rows=len(df)) as span:
+        changed_ids = _update_vector_database(db, df, manifest_path, lexical_index, question_store)
+        span["changed"] = len(changed_ids)
+    return changed_ids
 
 
-def initialize_db():
-    api_key = get_api_key()
-    llm_handler = LLMHandler(api_key=api_key)
-    vectorstore = llm_handler.create_vectorstore()
-    return vectorstore
+def _update_vector_database(db, df, manifest_path, lexical_index, question_store):
+    manifest = load_manifest(db, manifest_path)
+    with manifest.locked():
+        changed_ids, lexical_changed = _sync_locked(db, df, manifest, lexical_index, question_store)
 
+    if lexical_changed:
+        lexical_index.save()
 
-def update_vector_database(db, df):
-    existing_docs = db.get()
-    existing_pairs = {}
-    documents_to_remove = []
+    return changed_ids
 
-    # Mapear documentos existentes
-    if existing_docs["documents"]:
-        doc_metadatas = existing_docs.get("metadatas", [])
-        doc_documents = existing_docs.get("documents", [])
-        doc_ids = existing_docs.get("ids", [])
-        for doc_id, metadata, doc in zip(doc_ids, doc_metadatas, doc_documents):
-            unique_id = metadata.get("ID")
-            existing_pairs[unique_id] = (doc_id, metadata, doc)
 
+def _sync_locked(db, df, manifest, lexical_index, question_store):
+    records = df.to_dict("records")
+    # Só as entradas das linhas recebidas são lidas; as alteradas são gravadas ao final
+    entries = manifest.get_many(normalize_id(item.get("ID")) for item in records if item.get("ID"))
+    lexical_changed = False
+    documents_to_remove = []
     new_data = []
+    new_questions = []
+    new_ids = []
+    changed_ids = set()
 
-    # Processar cada linha do DataFrame
-    for _, item in df.iterrows():
+    # Processar apenas as linhas cujo hash mudou
+    for item in records:
         unique_id = item.get("ID")
         question = item.get("Pergunta")
         answer = item.get("Resposta")
@@ -63,48 +118,75 @@ def update_vector_database(db, df):
         status = item.get("Status")
         creation_date = item.get("Data de criação")
 
-        if unique_id and question and answer:
-            if status == "Inativo":
-                if unique_id in existing_pairs:
-                    doc_id, _, _ = existing_pairs[unique_id]
-                    documents_to_remove.append(doc_id)
-                continue
-
-            new_metadata = {
-                "ID": unique_id,
-                "Pergunta": question,
-                "Versão": version,
-                "Status": status,
-                "Data de criação": creation_date,
-            }
-
-            if unique_id in existing_pairs:
-                doc_id, existing_metadata, existing_answer = existing_pairs[unique_id]
-                if (
-                    existing_answer != answer
-                    or existing_metadata["Versão"] != version
-                    or existing_metadata["Status"] != status
-                    or existing_metadata["Pergunta"] != question
-                ):
-                    # Atualiza o documento existente
-                    updated_doc = Document(
-                        page_content=answer,
-                        metadata=new_metadata,
-                    )
-                    new_data.append(updated_doc)
-                    documents_to_remove.append(doc_id)
-            else:
-                # Adiciona novo documento
-                new_doc = Document(
-                    page_content=answer,
-                    metadata=new_metadata,
+        if not (unique_id and question and answer):
+            continue
+
+        key = normalize_id(unique_id)
+        entry = entries.get(key)
+
+        if status == "Inativo":
+            if entry:
+                documents_to_remove.append(entry["chroma_id"])
+                del entries[key]
+                changed_ids.add(key)
+            if lexical_index is not None and lexical_index.remove(key):
+                lexical_changed = True
+            continue
+
+        new_metadata = {
+            "ID": unique_id,
+            "Pergunta": question,
+            "Versão": version,
+            "Status": status,
+            "Data de criação": creation_date,
+        }
+        row_hash = compute_row_hash(answer, new_metadata)
+        unchanged = entry and entry["hash"] == row_hash
+
+        # O índice lexical é local: também recebe linhas que ainda não conhece
+        if lexical_index is not None and not (unchanged and key in lexical_index):
+            lexical_index.upsert(key, question, answer, new_metadata)
+            lexical_changed = True
+
+        if unchanged:
+            continue
+
+        if entry:
+            documents_to_remove.append(entry["chroma_id"])
+
+        chroma_id = str(uuid.uuid4())
+        new_data.append(Document(page_content=answer, metadata=new_metadata))
+        # A coleção de perguntas usa o mesmo id do documento de resposta
+        new_questions.append(
+            Document(page_content=question, metadata={**new_metadata, "Resposta": answer})
+        )
+        new_ids.append(chroma_id)
+        entries[key] = {
+            "chroma_id": chroma_id,
+            "hash": row_hash,
+            "version": _normalize_value(version),
+        }
+        changed_ids.add(key)
+
+    stores = [(db, new_data)]
+    if question_store is not None:
+        stores.append((question_store, new_questions))
+
+    for store, documents in stores:
+        # Remover documentos obsoletos em lotes
+        for start in range(0, len(documents_to_remove), BATCH_SIZE):
+            with tracer.span("vector_delete"):
+                store.delete(documents_to_remove[start:start + BATCH_SIZE])
+
+        # Adicionar novos documentos ou atualizações em lotes
+        for start in range(0, len(documents), BATCH_SIZE):
+            with tracer.span("vector_add", documents=len(documents[start:start + BATCH_SIZE])):
+                store.add_documents(
+                    documents[start:start + BATCH_SIZE], ids=new_ids[start:start + BATCH_SIZE]
                 )
-                new_data.append(new_doc)
-
-    # Remover documentos obsoletos
-    if documents_to_remove:
-        db.delete(documents_to_remove)
 
-    # Adicionar novos documentos ou atualizações
-    if new_data:
-        db.add_documents(new_data)
+    manifest.apply(
+        {key: entries[key] for key in changed_ids if key in entries},
+        removed=[key for key in changed_ids if key not in entries],
+    )
+    return changed_ids, lexical_changed
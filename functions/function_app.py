@@ -1,51 +1,111 @@
-import io
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from functions.db_functions import initialize_db
+from src.bulk_import import IMPORT_EXTENSIONS, BulkImporter, validate_chunk
+from src.lexical_index import normalize_text, tokenize
 from src.qa_database_handler import QADatabaseHandler
+from src.qa_filters import (QuestionNgramIndex, add_filter_columns,
+                            strip_filter_columns)
+from src.qa_storage import COLUMNS
 
 db_handler = QADatabaseHandler()
 
 
-def get_next_id(df):
-    """Retorna o próximo ID com base nos dados existentes."""
-    if df.empty:
-        return 1
-    try:
-        df["ID"] = pd.to_numeric(df["ID"], errors="coerce")
-        return int(df["ID"].max() + 1)
-    except ValueError:
-        return 1
+def apply_filters(data, status_filter, pergunta_filter, start_date, end_date, question_index=None):
+    """Aplica os filtros de status, pergunta e intervalo de data aos dados."""
+    if "_pergunta" not in data:
+        data = add_filter_columns(data.copy())
+    mask = data["_status"].isin(status_filter) & data["_data"].between(
+        pd.Timestamp(start_date), pd.Timestamp(end_date)
+    )
+    query = normalize_text(pergunta_filter.strip())
+    if query:
+        candidates = question_index.candidates(query) if question_index else None
+        if candidates is not None:
+            mask &= data.index.isin(list(candidates))
+        # A verificação final só percorre as linhas que sobraram dos outros filtros
+        mask.loc[mask] = data.loc[mask, "_pergunta"].str.contains(query, regex=False).to_numpy()
+    return data[mask]
 
 
-def apply_filters(data, status_filter, pergunta_filter, start_date, end_date):
-    """Aplica os filtros de status, pergunta e intervalo de data aos dados."""
-    return data[
-        (data["Status"].isin(status_filter))
-        & (data["Pergunta"].str.contains(pergunta_filter, case=False, na=False))
-        & (
-            pd.to_datetime(data["Data de criação"], dayfirst=True).dt.date.between(
-                start_date, end_date
-            )
-        )
-    ]
+def get_question_index():
+    """Índice de n-gramas da sessão, construído na primeira busca indexada."""
+    if st.session_state.get("question_index") is None:
+        st.session_state.question_index = QuestionNgramIndex.from_frame(st.session_state.data)
+    return st.session_state.question_index
+
+
+def update_session_row(index, values):
+    """Atualiza uma linha dos dados da sessão, suas colunas de filtro e o banco."""
+    return update_session_rows({index: values})[0]
+
+
+def update_session_rows(updates):
+    """Atualiza várias linhas da sessão (índice -> colunas) e grava todas com uma única escrita e sincronização."""
+    for index, values in updates.items():
+        for column, value in values.items():
+            st.session_state.data.loc[index, column] = value
+    indexes = list(updates)
+    add_filter_columns(st.session_state.data, indexes)
+    if st.session_state.get("question_index") is not None:
+        for index in indexes:
+            st.session_state.question_index.update(index, st.session_state.data.loc[index, "_pergunta"])
+    return db_handler.upsert_rows(st.session_state.data.loc[indexes].to_dict("records"))
+
+
+def append_session_row(row):
+    """Grava uma nova Pergunta e Resposta e a acrescenta aos dados da sessão."""
+    record = db_handler.upsert_row(row)
+    st.session_state.data = pd.concat(
+        [st.session_state.data, pd.DataFrame([record])], ignore_index=True
+    )
+    index = st.session_state.data.index[-1]
+    add_filter_columns(st.session_state.data, [index])
+    if st.session_state.get("question_index") is not None:
+        st.session_state.question_index.update(index, st.session_state.data.loc[index, "_pergunta"])
+    return record
+
+
+PAGE_SIZE_OPTIONS = (25, 50, 100, 250)
+EDITABLE_COLUMNS = ["Pergunta", "Resposta", "Status", "Data de criação"]
 
 
-def export_data_to_excel(filtered_data):
-    """Exporta os dados filtrados para um arquivo Excel."""
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        filtered_data.to_excel(writer, index=False, sheet_name="Sheet1")
-    output.seek(0)
-    return output
+def paginate(df, key, default_page_size=50):
+    """Exibe os controles de paginação e devolve apenas a fatia visível do DataFrame."""
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        page_size = st.selectbox(
+            "Itens por página",
+            options=PAGE_SIZE_OPTIONS,
+            index=PAGE_SIZE_OPTIONS.index(default_page_size),
+            key=f"{key}_page_size",
+        )
+    total_pages = max(1, -(-len(df) // page_size))
+    # Os filtros podem reduzir o total de páginas entre uma execução e outra
+    if st.session_state.get(f"{key}_page", 1) > total_pages:
+        st.session_state[f"{key}_page"] = total_pages
+    with col2:
+        page = st.number_input(
+            "Página", min_value=1, max_value=total_pages, step=1, key=f"{key}_page"
+        )
+    with col3:
+        st.write("")
+        st.caption(f"{len(df)} registros · página {page} de {total_pages}")
+    start = (page - 1) * page_size
+    return df.iloc[start : start + page_size]
+
 
+def display_main_table(filtered_df, editable=False):
+    """Exibe a tabela principal de Perguntas e Respostas, paginada."""
+    page_df = paginate(filtered_df, key="main_table")
+    if editable:
+        display_editable_table(page_df)
+        return
 
-def display_main_table(filtered_df):
-    """Exibe a tabela principal de Perguntas e Respostas."""
-    for index, row in filtered_df.iterrows():
+    for index, row in page_df.iterrows():
         st.write("---")
         cols = st.columns([1, 2, 3, 1, 1, 1, 1, 1])
 
@@ -72,18 +132,67 @@ def display_main_table(filtered_df):
             edit_document_form(index, row)
 
 
+def display_editable_table(page_df):
+    """Edição em grade da página visível; só as linhas alteradas são gravadas."""
+    # A chave muda com a página, para que o diff pendente não seja aplicado a outras linhas
+    editor_key = f"main_table_editor_{page_df.index[0]}_{len(page_df)}" if len(page_df) else "main_table_editor"
+    st.data_editor(
+        strip_filter_columns(page_df),
+        key=editor_key,
+        hide_index=True,
+        use_container_width=True,
+        disabled=[column for column in page_df.columns if column not in EDITABLE_COLUMNS],
+        column_config={
+            "Pergunta": st.column_config.TextColumn("Pergunta", required=True),
+            "Resposta": st.column_config.TextColumn("Resposta", width="large", required=True),
+            "Status": st.column_config.SelectboxColumn("Status", options=["Ativo", "Inativo"], required=True),
+            "Data de criação": st.column_config.TextColumn(
+                "Data de criação", required=True, validate=r"^\d{2}/\d{2}/\d{4}$"
+            ),
+        },
+    )
+    edited_rows = st.session_state.get(editor_key, {}).get("edited_rows", {})
+    if edited_rows and st.button(f"Salvar alterações ({len(edited_rows)} linhas)"):
+        errors = save_row_changes(page_df, edited_rows)
+        if errors:
+            # As linhas inválidas continuam editadas na grade para correção
+            for error in errors:
+                st.error(f"ID {error['ID']}: {error['Erro']}")
+        else:
+            del st.session_state[editor_key]
+            st.success("Alterações salvas com sucesso!")
+            st.rerun()
+
+
+def save_row_changes(page_df, edited_rows):
+    """Valida o diff do data_editor (posição na página -> colunas alteradas) como na importação,
+    grava as linhas válidas e retorna os erros das demais."""
+    indexes = [page_df.index[int(position)] for position in edited_rows]
+    rows = [
+        {**st.session_state.data.loc[index, COLUMNS].to_dict(), **changes}
+        for index, changes in zip(indexes, edited_rows.values())
+    ]
+    valid, errors = validate_chunk(pd.DataFrame(rows, columns=COLUMNS), first_line=0)
+    updates = {}
+    for position, values in zip(valid.index, valid[EDITABLE_COLUMNS].to_dict("records")):
+        index = indexes[position]
+        row = st.session_state.data.loc[index]
+        if any(values[column] != row[column] for column in ("Pergunta", "Resposta")):
+            values["Versão"] = row["Versão"] + 1
+        updates[index] = values
+    if updates:
+        update_session_rows(updates)
+    return [{"ID": rows[error["Linha"]]["ID"], "Erro": error["Erro"]} for error in errors]
+
+
 def delete_document(doc_id_to_delete, index):
     """Exclui o documento do banco de dados e do estado da sessão."""
-    db = initialize_db()
-    docs = db.get()
-    for doc_id, metadata in zip(docs["ids"], docs["metadatas"]):
-        if metadata["ID"] == doc_id_to_delete:
-            db.delete(ids=[doc_id])
-            break
+    db_handler.delete_row(doc_id_to_delete)
     st.session_state.data = st.session_state.data[
         st.session_state.data["ID"] != doc_id_to_delete
     ]
-    db_handler.save_data(st.session_state.data)
+    if st.session_state.get("question_index") is not None:
+        st.session_state.question_index.remove(index)
     st.success("Documento excluído com sucesso!")
     st.rerun()
 
@@ -114,14 +223,16 @@ def edit_document_form(index, row):
                 )
                 else current_version
             )
-            st.session_state.data.loc[index, "Pergunta"] = edited_question
-            st.session_state.data.loc[index, "Resposta"] = edited_answer
-            st.session_state.data.loc[index, "Versão"] = new_version
-            st.session_state.data.loc[index, "Status"] = edited_status
-            st.session_state.data.loc[index, "Data de criação"] = edited_date.strftime(
-                "%d/%m/%Y"
+            update_session_row(
+                index,
+                {
+                    "Pergunta": edited_question,
+                    "Resposta": edited_answer,
+                    "Versão": new_version,
+                    "Status": edited_status,
+                    "Data de criação": edited_date.strftime("%d/%m/%Y"),
+                },
             )
-            db_handler.save_data(st.session_state.data)
             st.success("Documento atualizado com sucesso!")
             st.session_state.edit_doc = None
             st.rerun()
@@ -140,42 +251,175 @@ def add_new_document_form():
             new_date = st.date_input("Data de criação")
 
             if st.form_submit_button("Salvar"):
-                new_id = get_next_id(st.session_state.data)
-                new_row = pd.DataFrame(
+                append_session_row(
                     {
-                        "ID": [new_id],
-                        "Pergunta": [new_question],
-                        "Resposta": [new_answer],
-                        "Versão": [new_version],
-                        "Status": [new_status],
-                        "Data de criação": [new_date.strftime("%d/%m/%Y")],
+                        "ID": None,  # atribuído pelo armazenamento
+                        "Pergunta": new_question,
+                        "Resposta": new_answer,
+                        "Versão": new_version,
+                        "Status": new_status,
+                        "Data de criação": new_date.strftime("%d/%m/%Y"),
                     }
                 )
-                st.session_state.data = pd.concat(
-                    [st.session_state.data, new_row], ignore_index=True
-                )
-                db_handler.save_data(st.session_state.data)
                 st.success("Pergunta e Resposta adicionadas com sucesso!")
                 st.session_state.new_doc = False
                 st.rerun()
 
 
-def evaluate_response(reference, generated):
-    if isinstance(reference, str) and isinstance(generated, str):
-        similarity = len(
-            set(generated.lower().split()) & set(reference.lower().split())
-        ) / len(set(reference.lower().split()))
-        if similarity > 0.8:
-            return "Correto", "A resposta segue a ideia central da resposta referência."
-        elif similarity > 0.5:
-            return (
-                "Parcialmente Correto",
-                "A resposta contém alguns elementos da resposta referência, mas não está completa.",
+def import_documents_form():
+    """Importação em massa de Perguntas e Respostas a partir de CSV, XLSX ou JSONL."""
+    if st.session_state.import_doc:
+        st.write("")
+        with st.form("import_documents"):
+            st.subheader("Importar Perguntas e Respostas")
+            st.caption(
+                "Colunas obrigatórias: Pergunta e Resposta. ID, Versão, Status e Data de criação são opcionais; "
+                "linhas sem ID recebem um novo."
             )
-        else:
-            return (
-                "Incorreto",
-                "A resposta não segue a ideia central da resposta referência.",
+            uploaded_file = st.file_uploader(
+                "Arquivo", type=[extension.lstrip(".") for extension in IMPORT_EXTENSIONS]
             )
-    else:
-        return ("Erro", "Entrada inválida: referência e resposta gerada devem ser strings.")
\ No newline at end of file
+            chunk_size = st.number_input("Linhas por bloco", min_value=100, max_value=10000, value=1000, step=100)
+
+            if st.form_submit_button("Importar") and uploaded_file is not None:
+                progress = st.empty()
+                importer = BulkImporter(db_handler, chunk_size=chunk_size)
+                try:
+                    summary = importer.import_file(
+                        uploaded_file,
+                        uploaded_file.name,
+                        on_progress=lambda summary: progress.info(
+                            f"{summary['imported']} linhas importadas de {summary['rows']} lidas..."
+                        ),
+                    )
+                except ValueError as e:
+                    st.error(f"Não foi possível importar o arquivo: {e}")
+                    return
+                progress.empty()
+
+                st.session_state.data = db_handler.load_data()
+                st.session_state.question_index = None
+                st.success(
+                    f"{summary['imported']} de {summary['rows']} linhas importadas em {summary['seconds']:.1f} s."
+                )
+                if summary["errors"]:
+                    st.warning(f"{len(summary['errors'])} linhas ignoradas por erros de validação.")
+                    st.dataframe(pd.DataFrame(summary["errors"][:500]), use_container_width=True)
+
+
+EVALUATION_METRICS = ("semantic", "f1", "rouge_l")
+# Limiares (correto, parcialmente correto) por métrica
+EVALUATION_THRESHOLDS = {"semantic": (0.85, 0.7), "f1": (0.6, 0.35), "rouge_l": (0.5, 0.3)}
+EVALUATION_REASONS = {
+    "Correto": "A resposta segue a ideia central da resposta referência.",
+    "Parcialmente Correto": "A resposta contém alguns elementos da resposta referência, mas não está completa.",
+    "Incorreto": "A resposta não segue a ideia central da resposta referência.",
+    "Erro": "Entrada inválida: referência e resposta gerada devem ser strings.",
+}
+
+
+def _cosine_similarities(reference_vectors, generated_vectors):
+    """Similaridade de cosseno par a par entre as linhas das duas matrizes."""
+    reference_vectors = np.asarray(reference_vectors, dtype=np.float32)
+    generated_vectors = np.asarray(generated_vectors, dtype=np.float32)
+    norms = np.linalg.norm(reference_vectors, axis=1) * np.linalg.norm(generated_vectors, axis=1)
+    dots = np.einsum("ij,ij->i", reference_vectors, generated_vectors)
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+
+def _token_f1(reference_tokens, generated_tokens):
+    """F1 de tokens (com multiplicidade) para todos os pares de uma vez."""
+    vocabulary = {}
+
+    def encode(tokens):
+        return [vocabulary.setdefault(token, len(vocabulary)) for token in tokens]
+
+    reference_ids = [encode(tokens) for tokens in reference_tokens]
+    generated_ids = [encode(tokens) for tokens in generated_tokens]
+    size = max(len(vocabulary), 1)
+
+    def pair_counts(token_ids):
+        rows = np.repeat(np.arange(len(token_ids)), [len(ids) for ids in token_ids])
+        keys = rows * size + np.fromiter((i for ids in token_ids for i in ids), dtype=np.int64, count=len(rows))
+        return np.unique(keys, return_counts=True)
+
+    reference_keys, reference_counts = pair_counts(reference_ids)
+    generated_keys, generated_counts = pair_counts(generated_ids)
+    _, reference_pos, generated_pos = np.intersect1d(
+        reference_keys, generated_keys, assume_unique=True, return_indices=True
+    )
+    overlap = np.bincount(
+        reference_keys[reference_pos] // size,
+        weights=np.minimum(reference_counts[reference_pos], generated_counts[generated_pos]),
+        minlength=len(reference_ids),
+    )
+    reference_lengths = np.array([len(ids) for ids in reference_ids], dtype=float)
+    generated_lengths = np.array([len(ids) for ids in generated_ids], dtype=float)
+    totals = reference_lengths + generated_lengths
+    return np.divide(2 * overlap, totals, out=np.zeros_like(overlap), where=totals > 0)
+
+
+def _lcs_length(reference, generated):
+    """Comprimento da maior subsequência comum, com paralelismo de bits (Allison-Dix)."""
+    masks = {}
+    for position, token in enumerate(reference):
+        masks[token] = masks.get(token, 0) | (1 << position)
+    row = 0
+    for token in generated:
+        match = masks.get(token, 0)
+        carry = match | row
+        row = carry & ~(carry - ((row << 1) | 1))
+    return bin(row).count("1")
+
+
+def _rouge_l(reference_tokens, generated_tokens):
+    lcs = np.array([_lcs_length(ref, gen) for ref, gen in zip(reference_tokens, generated_tokens)], dtype=float)
+    reference_lengths = np.array([len(tokens) for tokens in reference_tokens], dtype=float)
+    generated_lengths = np.array([len(tokens) for tokens in generated_tokens], dtype=float)
+    totals = reference_lengths + generated_lengths
+    return np.divide(2 * lcs, totals, out=np.zeros_like(lcs), where=totals > 0)
+
+
+def evaluate_responses(references, generated, embeddings=None, metric="semantic", thresholds=None, lexical_metrics=True):
+    """Avalia um lote de respostas contra as referências.
+
+    Com `metric="semantic"` as respostas são embutidas em lote (`embeddings.embed_documents`) e
+    comparadas por cosseno; "f1" e "rouge_l" usam só os tokens normalizados. Devolve um DataFrame
+    alinhado às entradas com as colunas de métrica, "Validação" e "Motivo".
+    """
+    if metric not in EVALUATION_METRICS:
+        raise ValueError(f"Métrica de avaliação inválida: {metric}. Use uma de {EVALUATION_METRICS}.")
+    if metric == "semantic" and embeddings is None:
+        raise ValueError("A métrica semântica exige um modelo de embeddings.")
+    correct_threshold, partial_threshold = thresholds or EVALUATION_THRESHOLDS[metric]
+
+    references = list(references)
+    generated = list(generated)
+    valid = np.array([isinstance(ref, str) and isinstance(gen, str) for ref, gen in zip(references, generated)], dtype=bool)
+    valid_references = [ref for ref, ok in zip(references, valid) if ok]
+    valid_generated = [gen for gen, ok in zip(generated, valid) if ok]
+
+    scores = pd.DataFrame(index=range(len(references)))
+    if valid.any():
+        if metric == "semantic":
+            vectors = np.asarray(embeddings.embed_documents(valid_references + valid_generated), dtype=np.float32)
+            scores.loc[valid, "Similaridade"] = _cosine_similarities(vectors[: len(valid_references)], vectors[len(valid_references):])
+        if lexical_metrics or metric != "semantic":
+            reference_tokens = [tokenize(text) for text in valid_references]
+            generated_tokens = [tokenize(text) for text in valid_generated]
+            scores.loc[valid, "F1"] = _token_f1(reference_tokens, generated_tokens)
+            scores.loc[valid, "ROUGE-L"] = _rouge_l(reference_tokens, generated_tokens)
+
+    score_column = {"semantic": "Similaridade", "f1": "F1", "rouge_l": "ROUGE-L"}[metric]
+    if score_column not in scores:
+        scores[score_column] = np.nan
+    score = scores[score_column].to_numpy(dtype=float)
+    labels = np.select(
+        [~valid, score > correct_threshold, score > partial_threshold],
+        ["Erro", "Correto", "Parcialmente Correto"],
+        default="Incorreto",
+    )
+    scores["Validação"] = labels
+    scores["Motivo"] = pd.Series(labels).map(EVALUATION_REASONS)
+    return scores.round(3)
+
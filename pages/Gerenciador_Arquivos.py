@@ -4,8 +4,11 @@ from datetime import datetime, timedelta
 import streamlit as st
 
 from functions.function_app import (add_new_document_form, apply_filters,
-                                    display_main_table, export_data_to_excel)
+                                    display_main_table, get_question_index,
+                                    import_documents_form)
+from src.exports import EXPORT_FORMATS, export_bytes
 from src.qa_database_handler import QADatabaseHandler
+from src.qa_filters import strip_filter_columns
 
 # Inicialize o manipulador de banco de dados
 db_handler = QADatabaseHandler()
@@ -28,6 +31,9 @@ status_filter = st.sidebar.multiselect(
     "Status dos documentos", options=["Ativo", "Inativo"], default=["Ativo", "Inativo"]
 )
 pergunta_filter = st.sidebar.text_input("Filtrar por pergunta")
+indexed_search = st.sidebar.toggle(
+    "Busca indexada", help="Usa um índice de trigramas das perguntas; recomendado para bases grandes."
+)
 
 # Definir um intervalo de datas padrão (por exemplo, último ano até hoje)
 default_start_date = datetime.now().date() - timedelta(days=365)
@@ -48,7 +54,12 @@ else:
 
 # Aplicar filtros
 filtered_df = apply_filters(
-    st.session_state.data, status_filter, pergunta_filter, start_date, end_date
+    st.session_state.data,
+    status_filter,
+    pergunta_filter,
+    start_date,
+    end_date,
+    question_index=get_question_index() if indexed_search else None,
 )
 
 # Botões principais
@@ -58,23 +69,39 @@ with col1:
         st.session_state.new_doc = True
 
 with col2:
-    if st.button("Exportar dados"):
-        output = export_data_to_excel(filtered_df)
-        st.download_button(
-            label="Download Excel",
-            data=output,
-            file_name="qa_database.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        )
+    export_format = st.selectbox(
+        "Formato de exportação",
+        options=list(EXPORT_FORMATS),
+        format_func=lambda export_format: EXPORT_FORMATS[export_format][0],
+        label_visibility="collapsed",
+    )
+    # O arquivo só é gerado quando o download é solicitado
+    st.download_button(
+        label="Exportar dados",
+        data=lambda: export_bytes(strip_filter_columns(filtered_df), export_format),
+        file_name=f"qa_database.{export_format}",
+        mime=EXPORT_FORMATS[export_format][1],
+        on_click="ignore",
+    )
+
+with col3:
+    if st.button("Importar dados"):
+        st.session_state.import_doc = True
 
 # Modal para novo documento
 if "new_doc" not in st.session_state:
     st.session_state.new_doc = False
+if "import_doc" not in st.session_state:
+    st.session_state.import_doc = False
 
 add_new_document_form()
+import_documents_form()
 
-# Tabela principal com botões de edição e exclusão
-display_main_table(filtered_df)
+# Tabela principal com botões de edição e exclusão, ou em grade editável
+view_mode = st.radio(
+    "Visualização", options=["Lista", "Tabela editável"], horizontal=True, label_visibility="collapsed"
+)
+display_main_table(filtered_df, editable=view_mode == "Tabela editável")
 
 # Botão para limpar filtros
 if st.sidebar.button("Limpar Filtros"):
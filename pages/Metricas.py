@@ -0,0 +1,42 @@
+import pandas as pd
+import streamlit as st
+
+from src.tracing import tracer
+
+st.set_page_config(layout="wide", page_title="Métricas - BlueShift")
+st.sidebar.image(
+    "https://blueshift.com.br/assets/Logo-Blueshift-8KLAJS3K.svg", use_column_width=True
+)
+st.title("Gemini - Métricas do pipeline")
+
+summary = tracer.summary()
+
+if not summary:
+    st.info("Nenhuma etapa registrada ainda. Envie uma pergunta no chat para gerar métricas.")
+else:
+    st.subheader("Latência por etapa")
+    summary_df = pd.DataFrame(summary)
+    st.dataframe(
+        summary_df,
+        use_container_width=True,
+        column_config={
+            "p50_ms": st.column_config.NumberColumn("p50 (ms)", format="%.1f"),
+            "p95_ms": st.column_config.NumberColumn("p95 (ms)", format="%.1f"),
+            "taxa_cache": st.column_config.NumberColumn("Taxa de cache", format="%.2f"),
+        },
+    )
+    st.bar_chart(summary_df.set_index("etapa")[["p50_ms", "p95_ms"]])
+
+    st.subheader("Registros recentes")
+    st.dataframe(
+        pd.DataFrame(list(tracer.records)[-200:][::-1]), use_container_width=True
+    )
+
+col1, col2 = st.columns(2)
+with col1:
+    if st.button("Atualizar"):
+        st.rerun()
+with col2:
+    if st.button("Limpar métricas"):
+        tracer.clear()
+        st.rerun()
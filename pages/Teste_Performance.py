@@ -1,34 +1,18 @@
 from datetime import datetime
 
-import google.auth
 import pandas as pd
 import streamlit as st
-from google.cloud import secretmanager
 
-from functions.function_app import evaluate_response
-from src.llm_handler import LLMHandler
+from functions.function_app import (EVALUATION_THRESHOLDS, append_session_row,
+                                    evaluate_responses, paginate,
+                                    update_session_row)
+from src.exports import export_bytes
 from src.qa_database_handler import QADatabaseHandler
-from src.secret_manager import SecretManager
-
-# Configuração do Secret Manager e API Gemini
-credentials, project = google.auth.default()
-client = secretmanager.SecretManagerServiceClient(credentials=credentials)
-secret_manager = SecretManager(project=project, client=client)
-api_key = secret_manager.access_secret_version("GEMINI_API_KEY")
-
-if api_key is None:
-    print("Chave API não encontrada no Secret Manager. Tentando carregar do .env...")
-    api_key = secret_manager.load_from_env("GEMINI_API_KEY")
-
-if api_key is None:
-    raise ValueError(
-        "Não foi possível obter a chave API do Gemini. Verifique o Secret Manager ou o arquivo .env."
-    )
+from src.resources import get_llm_handler
 
 db_handler = QADatabaseHandler()
 
-llm_handler = LLMHandler(api_key=api_key)
-vectorstore = llm_handler.create_vectorstore()
+llm_handler = get_llm_handler()
 
 
 st.set_page_config(layout="wide", page_title="Teste de performance - BlueShift")
@@ -58,47 +42,126 @@ def main_page():
         options=st.session_state.data["Pergunta"].tolist(),
     )
 
+    response_mode = st.radio(
+        "Modo de resposta",
+        options=["single_pass", "two_step"],
+        format_func=lambda mode: {
+            "single_pass": "Chamada única (contexto + histórico)",
+            "two_step": "Duas chamadas (RetrievalQA + reformulação)",
+        }[mode],
+        horizontal=True,
+    )
+
+    max_workers = st.number_input(
+        "Requisições simultâneas", min_value=1, max_value=16, value=4, step=1
+    )
+
+    with st.expander("Critérios de avaliação"):
+        evaluation_metric = st.radio(
+            "Métrica",
+            options=["semantic", "f1", "rouge_l"],
+            format_func=lambda metric: {
+                "semantic": "Similaridade semântica (embeddings)",
+                "f1": "F1 de tokens",
+                "rouge_l": "ROUGE-L",
+            }[metric],
+            horizontal=True,
+        )
+        default_correct, default_partial = EVALUATION_THRESHOLDS[evaluation_metric]
+        correct_threshold = st.slider(
+            "Limiar para Correto", 0.0, 1.0, default_correct, 0.05, key=f"correct_{evaluation_metric}"
+        )
+        partial_threshold = st.slider(
+            "Limiar para Parcialmente Correto", 0.0, 1.0, default_partial, 0.05, key=f"partial_{evaluation_metric}"
+        )
+
     if st.button("Iniciar Teste de Performance"):
         st.write("")
         st.write("")
         if selected_questions:
-            with st.spinner("Testando o modelo..."):
-                results = llm_handler.test_performance(selected_questions)
+            progress_bar = st.progress(0.0, text="Testando o modelo...")
+            partial_table = st.empty()
+            completed_rows = []
+
+            def show_progress(completed, total, index, result):
+                progress_bar.progress(
+                    completed / total, text=f"Testando o modelo... {completed}/{total}"
+                )
+                completed_rows.append(
+                    {
+                        "Iteração": index + 1,
+                        "Pergunta": result["question"],
+                        "Resposta": result["response"] or result["error"],
+                        "Tempo (s)": round(result["seconds"], 2),
+                    }
+                )
+                partial_table.dataframe(
+                    pd.DataFrame(completed_rows).sort_values("Iteração"),
+                    use_container_width=True,
+                )
+
+            results = llm_handler.run_performance_batch(
+                selected_questions,
+                mode=response_mode,
+                max_workers=max_workers,
+                on_result=show_progress,
+            )
+            progress_bar.empty()
+            partial_table.empty()
 
             pergunta_resposta_dict = dict(zip(st.session_state.data["Pergunta"], st.session_state.data["Resposta"]))
+            # Respostas com falha vão como None para a avaliação, que as classifica como "Erro"
+            responses = [str(result["response"]) if result["error"] is None else None for result in results]
 
             results_df = pd.DataFrame(
                 {
                     "Iteração": range(1, len(selected_questions) + 1),
                     "Pergunta": selected_questions,
                     "Resposta de Referência": [pergunta_resposta_dict[q] for q in selected_questions],
-                    "Resposta": results,
+                    "Resposta": [
+                        response if response is not None else f"Erro: {result['error']}"
+                        for response, result in zip(responses, results)
+                    ],
+                    "Tempo (s)": [round(result["seconds"], 2) for result in results],
+                    "Tentativas": [result["attempts"] for result in results],
+                    "Modo": response_mode,
                 }
             )
 
-            results_df["Resposta"] = results_df["Resposta"].apply(str)
-
-            results_df[["Validação", "Motivo"]] = results_df.apply(
-                lambda row: evaluate_response(
-                    row["Resposta de Referência"], row["Resposta"]
-                ),
-                axis=1,
-                result_type="expand",
+            evaluation = evaluate_responses(
+                results_df["Resposta de Referência"],
+                responses,
+                embeddings=llm_handler.embeddings,
+                metric=evaluation_metric,
+                thresholds=(correct_threshold, partial_threshold),
             )
+            results_df = pd.concat([results_df, evaluation], axis=1)
 
             st.subheader("Detalhamento dos Resultados")
             st.dataframe(results_df, use_container_width=True)
 
-            csv = results_df.to_csv(index=False).encode("utf-8")
             st.download_button(
                 label="Baixar Resultados como CSV",
-                data=csv,
+                data=lambda: export_bytes(results_df, "csv"),
                 file_name="resultados_teste_performance.csv",
                 mime="text/csv",
+                on_click="ignore",
             )
 
         else:
             st.warning("Por favor, selecione pelo menos uma pergunta para testar.")
+
+    with st.expander("Cache semântico de respostas"):
+        cache_stats = llm_handler.response_cache.stats()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Taxa de acerto", f"{cache_stats['hit_rate']:.0%}")
+        col2.metric("Acertos", cache_stats["hits"])
+        col3.metric("Falhas", cache_stats["misses"])
+        col4.metric("Entradas", cache_stats["entries"])
+        if st.button("Limpar cache"):
+            llm_handler.response_cache.clear()
+            st.rerun()
+
     st.warning(
         "ATENÇÃO: Você está prestes a iniciar o teste massivo de validação das respostas. O processo pode demorar alguns minutos. Tem certeza que deseja prosseguir?"
     )
@@ -127,7 +190,7 @@ def edit_page():
                 edited_status = st.selectbox("Status", options=["Ativo", "Inativo"])
                 edited_version = 1
             else:
-                row = st.session_state.data.iloc[st.session_state.edit_index]
+                row = st.session_state.data.loc[st.session_state.edit_index]
                 st.subheader(f"Editar: {row['Pergunta']}")
                 edited_question = st.text_input("Pergunta", value=row["Pergunta"])
                 edited_answer = st.text_area("Resposta", value=row["Resposta"])
@@ -140,42 +203,34 @@ def edit_page():
 
             if st.form_submit_button("Salvar"):
                 if st.session_state.edit_index == -1:
-                    new_row = pd.DataFrame(
+                    append_session_row(
                         {
-                            "Pergunta": [edited_question],
-                            "Resposta": [edited_answer],
-                            "Versão": [edited_version],
-                            "Status": [edited_status],
-                            "Data de criação": [datetime.now().strftime("%d/%m/%Y")],
+                            "ID": None,  # atribuído pelo armazenamento
+                            "Pergunta": edited_question,
+                            "Resposta": edited_answer,
+                            "Versão": edited_version,
+                            "Status": edited_status,
+                            "Data de criação": datetime.now().strftime("%d/%m/%Y"),
                         }
                     )
-                    st.session_state.data = pd.concat(
-                        [st.session_state.data, new_row], ignore_index=True
-                    )
                     st.success("Nova pergunta e resposta adicionadas com sucesso!")
                 else:
-                    st.session_state.data.loc[
-                        st.session_state.edit_index, "Pergunta"
-                    ] = edited_question
-                    st.session_state.data.loc[
-                        st.session_state.edit_index, "Resposta"
-                    ] = edited_answer
-                    st.session_state.data.loc[st.session_state.edit_index, "Status"] = (
-                        edited_status
-                    )
-                    st.session_state.data.loc[st.session_state.edit_index, "Versão"] = (
-                        edited_version
+                    update_session_row(
+                        st.session_state.edit_index,
+                        {
+                            "Pergunta": edited_question,
+                            "Resposta": edited_answer,
+                            "Status": edited_status,
+                            "Versão": edited_version,
+                            "Data de criação": datetime.now().strftime("%d/%m/%Y"),
+                        },
                     )
-                    st.session_state.data.loc[
-                        st.session_state.edit_index, "Data de criação"
-                    ] = datetime.now().strftime("%d/%m/%Y")
                     st.success("Alterações salvas com sucesso!")
 
-                db_handler.save_data(st.session_state.data)
                 st.session_state.edit_index = None
                 st.rerun()
 
-    for index, row in st.session_state.data.iterrows():
+    for index, row in paginate(st.session_state.data, key="edit_page").iterrows():
         col1, col2, col3, col4, col5 = st.columns([3, 3, 1, 1, 1])
         with col1:
             st.write(f"**Pergunta:** {row['Pergunta']}")
@@ -0,0 +1,162 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from src.lexical_index import normalize_text
+from src.qa_storage import COLUMNS
+from src.tracing import tracer
+
+IMPORT_EXTENSIONS = (".csv", ".xlsx", ".jsonl")
+STATUS_OPTIONS = ("Ativo", "Inativo")
+# Cabeçalhos aceitos sem acento/maiúsculas, com espaço ou sublinhado (ex.: "data_de_criacao")
+COLUMN_ALIASES = {normalize_text(column).replace(" ", "_"): column for column in COLUMNS}
+
+
+def read_chunks(file, file_name, chunk_size=1000):
+    """Lê CSV, XLSX ou JSONL em blocos de DataFrame, sem carregar o arquivo inteiro."""
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension == ".csv":
+        yield from pd.read_csv(file, chunksize=chunk_size, dtype=str, keep_default_na=False)
+    elif extension == ".jsonl":
+        yield from pd.read_json(file, lines=True, chunksize=chunk_size, dtype=False)
+    elif extension == ".xlsx":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(value) if value is not None else "" for value in next(rows, [])]
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == chunk_size:
+                    yield pd.DataFrame(chunk, columns=header)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=header)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Formato não suportado: {extension}. Use um de {IMPORT_EXTENSIONS}.")
+
+
+def _parse_dates(values):
+    text = values.map(lambda value: "" if value is None or pd.isna(value) else str(value).strip())
+    dates = pd.to_datetime(text, format="%d/%m/%Y", errors="coerce")
+    iso = dates.isna() & (text != "")
+    dates[iso] = pd.to_datetime(text[iso], format="ISO8601", errors="coerce")
+    return dates, text
+
+
+def validate_chunk(df, first_line=2):
+    """Normaliza um bloco importado; devolve (linhas válidas com COLUMNS, lista de erros por linha)."""
+    df = df.rename(columns=lambda column: COLUMN_ALIASES.get(normalize_text(column).strip().replace(" ", "_"), column))
+    missing = {"Pergunta", "Resposta"} - set(df.columns)
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(sorted(missing))}.")
+    df = df.reindex(columns=COLUMNS).reset_index(drop=True)
+
+    for column in ("Pergunta", "Resposta"):
+        df[column] = df[column].map(lambda value: "" if value is None or pd.isna(value) else str(value).strip())
+    df["Status"] = df["Status"].map(
+        lambda value: "Ativo" if value is None or pd.isna(value) or not str(value).strip() else str(value).strip().capitalize()
+    )
+    df["Versão"] = pd.to_numeric(df["Versão"], errors="coerce").fillna(1).astype(int)
+    df["ID"] = pd.to_numeric(df["ID"], errors="coerce")
+    dates, raw_dates = _parse_dates(df["Data de criação"])
+    df["Data de criação"] = dates.dt.strftime("%d/%m/%Y").fillna(datetime.now().strftime("%d/%m/%Y"))
+
+    problems = {
+        "Pergunta vazia": df["Pergunta"] == "",
+        "Resposta vazia": df["Resposta"] == "",
+        "Status inválido": ~df["Status"].isin(STATUS_OPTIONS),
+        "Data de criação inválida": dates.isna() & (raw_dates != ""),
+    }
+    invalid = pd.Series(False, index=df.index)
+    errors = []
+    for message, mask in problems.items():
+        invalid |= mask
+        errors.extend({"Linha": first_line + position, "Erro": message} for position in df.index[mask])
+    return df[~invalid], sorted(errors, key=lambda error: error["Linha"])
+
+
+class BulkImporter:
+    """Importa Perguntas e Respostas em blocos: valida, gera embeddings em lote e grava.
+
+    Os embeddings de cada bloco são gerados antes da gravação, em lotes de `embedding_batch_size`
+    com até `max_concurrency` chamadas simultâneas; como passam pelo CachedEmbeddings, a sincronização
+    do Chroma em `upsert_rows` já os encontra em cache. Armazenamento e Chroma recebem um commit por bloco.
+    """
+
+    def __init__(self, db_handler, embeddings=None, chunk_size=1000, embedding_batch_size=100, max_concurrency=4):
+        self.db_handler = db_handler
+        self.embeddings = embeddings
+        self.chunk_size = chunk_size
+        self.embedding_batch_size = embedding_batch_size
+        self.max_concurrency = max_concurrency
+
+    def _get_embeddings(self):
+        if self.embeddings is None:
+            from src.resources import get_llm_handler
+
+            self.embeddings = get_llm_handler().embeddings
+        return self.embeddings
+
+    def prefetch_embeddings(self, texts):
+        batches = [texts[start:start + self.embedding_batch_size] for start in range(0, len(texts), self.embedding_batch_size)]
+        embeddings = self._get_embeddings()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            list(executor.map(embeddings.embed_documents, batches))
+
+    def import_file(self, file, file_name, on_progress=None):
+        """Importa o arquivo e devolve um resumo com linhas lidas, importadas, erros e duração."""
+        start = time.perf_counter()
+        # CSV e XLSX têm a linha de cabeçalho; no JSONL a primeira linha já é um registro
+        header_lines = 0 if file_name.lower().endswith(".jsonl") else 1
+        summary = {"rows": 0, "imported": 0, "errors": []}
+
+        with tracer.trace("bulk_import", file=file_name):
+            for chunk_index, chunk in enumerate(read_chunks(file, file_name, self.chunk_size)):
+                valid, errors = validate_chunk(chunk, first_line=summary["rows"] + 1 + header_lines)
+                summary["rows"] += len(chunk)
+                summary["errors"].extend(errors)
+
+                # IDs repetidos no arquivo ficam com a última linha; os ausentes são atribuídos pelo
+                # armazenamento dentro do lock/transação da gravação, sem colidir com linhas novas de outros usuários
+                valid = valid[valid["ID"].isna() | ~valid["ID"].duplicated(keep="last")]
+
+                if len(valid):
+                    with tracer.span("import_chunk", chunk=chunk_index, rows=len(valid)):
+                        active = valid[valid["Status"] != "Inativo"]
+                        self.prefetch_embeddings(active["Resposta"].tolist() + active["Pergunta"].tolist())
+                        self.db_handler.upsert_rows(valid.to_dict("records"))
+                    summary["imported"] += len(valid)
+
+                if on_progress:
+                    on_progress(summary)
+
+        summary["seconds"] = time.perf_counter() - start
+        return summary
+
+
+if __name__ == "__main__":
+    from src.qa_database_handler import QADatabaseHandler
+
+    parser = argparse.ArgumentParser(description="Importa Perguntas e Respostas de CSV, XLSX ou JSONL.")
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    importer = BulkImporter(QADatabaseHandler(), chunk_size=args.chunk_size, max_concurrency=args.max_concurrency)
+    with open(args.path, "rb") as f:
+        summary = importer.import_file(
+            f, args.path, on_progress=lambda summary: print(f"{summary['imported']}/{summary['rows']} linhas...")
+        )
+    for error in summary["errors"]:
+        print(f"Linha {error['Linha']}: {error['Erro']}")
+    print(f"{summary['imported']} de {summary['rows']} linhas importadas em {summary['seconds']:.1f} s.")
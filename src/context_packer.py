@@ -0,0 +1,91 @@
+import os
+
+from src.lexical_index import tokenize
+from src.tokens import count_tokens
+from src.tracing import tracer
+
+
+class ContextPacker:
+    """Seleciona os documentos recuperados que entram no prompt.
+
+    Aplica o corte de relevância (absoluto, se configurado, e relativo ao melhor documento, o que dá
+    um k adaptativo), remove trechos quase idênticos e encaixa o restante no orçamento de tokens, na
+    ordem do ranking. Documentos sem pontuação passam pelo corte e são limitados pelos demais critérios.
+    """
+
+    def __init__(self, max_tokens=1500, max_documents=3, min_documents=1, fetch_k=8, min_relevance=None,
+                 relative_cutoff=0.6, dedup_threshold=0.85, token_counter=count_tokens):
+        self.max_tokens = max_tokens
+        self.max_documents = max_documents
+        self.min_documents = min_documents
+        self.fetch_k = fetch_k
+        self.min_relevance = min_relevance
+        self.relative_cutoff = relative_cutoff
+        self.dedup_threshold = dedup_threshold
+        self.token_counter = token_counter
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        settings = {
+            "max_tokens": int(os.getenv("CONTEXT_MAX_TOKENS", "1500")),
+            "max_documents": int(os.getenv("CONTEXT_MAX_DOCUMENTS", "3")),
+            "fetch_k": int(os.getenv("CONTEXT_FETCH_K", "8")),
+            "min_relevance": float(os.environ["CONTEXT_MIN_RELEVANCE"]) if os.getenv("CONTEXT_MIN_RELEVANCE") else None,
+            "relative_cutoff": float(os.getenv("CONTEXT_RELATIVE_CUTOFF", "0.6")),
+        }
+        settings.update(kwargs)
+        return cls(**settings)
+
+    def select(self, scored_docs, k=None):
+        """Corte de relevância e k adaptativo sobre a lista ranqueada de (documento, pontuação)."""
+        k = k or self.max_documents
+        passing = [
+            (doc, score) for doc, score in scored_docs
+            if score is None or self.min_relevance is None or score >= self.min_relevance
+        ]
+        scores = [score for _, score in passing if score is not None]
+        # O corte relativo só faz sentido quando o melhor documento tem relevância positiva
+        if not scores or max(scores) <= 0:
+            return [doc for doc, _ in passing[:k]]
+        floor = max(scores) * self.relative_cutoff
+        selected = [
+            doc for position, (doc, score) in enumerate(passing)
+            if score is None or score >= floor or position < self.min_documents
+        ]
+        return selected[:k]
+
+    def deduplicate(self, docs):
+        kept, kept_tokens = [], []
+        for doc in docs:
+            tokens = set(tokenize(doc.page_content))
+            if any(
+                tokens and len(tokens & other) / len(tokens | other) >= self.dedup_threshold
+                for other in kept_tokens
+            ):
+                continue
+            kept.append(doc)
+            kept_tokens.append(tokens)
+        return kept
+
+    def fit_budget(self, docs):
+        """Mantém os documentos que cabem no orçamento; o primeiro é truncado se sozinho já exceder."""
+        packed, used = [], 0
+        for doc in docs:
+            tokens = self.token_counter(doc.page_content)
+            if used + tokens <= self.max_tokens:
+                packed.append(doc)
+                used += tokens
+            elif not packed:
+                # Corte proporcional em caracteres, para não depender do tokenizador para decodificar
+                length = int(len(doc.page_content) * self.max_tokens / tokens)
+                packed.append(doc.model_copy(update={"page_content": doc.page_content[:length]}))
+                used = self.max_tokens
+        return packed, used
+
+    def pack(self, scored_docs, k=None):
+        with tracer.span("context_packing", candidates=len(scored_docs)) as span:
+            docs = self.deduplicate(self.select(scored_docs, k=k))
+            docs, used = self.fit_budget(docs)
+            span["documents"] = len(docs)
+            span["context_tokens"] = used
+        return docs
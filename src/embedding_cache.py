@@ -0,0 +1,107 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.tracing import tracer
+
+
+class CachedEmbeddings(Embeddings):
+    def __init__(self, underlying, db_path="embeddings_cache.sqlite3", namespace=None, memory_size=4096):
+        self.underlying = underlying
+        self.namespace = namespace or getattr(underlying, "model", type(underlying).__name__)
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+
+    def _key(self, text, kind):
+        # Consultas e documentos usam task types diferentes no Gemini
+        return hashlib.sha256(f"{self.namespace}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _get_many(self, keys, persist=True):
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                else:
+                    missing.append(key)
+            if not persist:
+                return found
+            for start in range(0, len(missing), 500):
+                batch = missing[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                    self._remember(key, vector)
+                    found[key] = vector
+        return found
+
+    def _put_many(self, items, persist=True):
+        with self._lock:
+            if persist:
+                with self._connection:
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items],
+                    )
+            for key, vector in items:
+                self._remember(key, vector)
+
+    def embed_documents(self, texts):
+        keys = [self._key(text, "document") for text in texts]
+        found = self._get_many(keys)
+
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                pending.setdefault(key, text)
+
+        self.hits += len(texts) - len(pending)
+        self.misses += len(pending)
+        if pending:
+            with tracer.span("document_embedding", texts=len(pending), cached=len(texts) - len(pending)):
+                vectors = self.underlying.embed_documents(list(pending.values()))
+            items = list(zip(pending.keys(), vectors))
+            self._put_many(items)
+            found.update(items)
+
+        return [list(found[key]) for key in keys]
+
+    def embed_query(self, text):
+        # Consultas ficam só no LRU em memória: no SQLite, cada pergunta distinta seria gravada para sempre
+        with tracer.span("query_embedding") as span:
+            key = self._key(text, "query")
+            found = self._get_many([key], persist=False)
+            span["cache_hit"] = key in found
+            if key in found:
+                self.hits += 1
+                return list(found[key])
+
+            self.misses += 1
+            vector = self.underlying.embed_query(text)
+        self._put_many([(key, vector)], persist=False)
+        return vector
@@ -0,0 +1,126 @@
+import math
+import tempfile
+
+import pandas as pd
+
+from src.tracing import tracer
+
+EXPORT_CHUNK_SIZE = 5000
+# Até este tamanho o arquivo gerado fica em memória; acima disso vai para um arquivo temporário
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+EXPORT_FORMATS = {
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("CSV", "text/csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+}
+
+
+def iter_chunks(data, chunk_size=EXPORT_CHUNK_SIZE, columns=None):
+    """Divide um DataFrame, ou um iterável de registros, em blocos de DataFrame.
+
+    Sempre produz ao menos um bloco (vazio, com `columns`), para que o arquivo tenha cabeçalho ou esquema.
+    """
+    if isinstance(data, pd.DataFrame):
+        if data.empty:
+            yield data  # mantém o cabeçalho
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+        return
+    chunk = []
+    emitted = False
+    for record in data:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield pd.DataFrame(chunk, columns=columns)
+            chunk = []
+            emitted = True
+    if chunk or not emitted:
+        yield pd.DataFrame(chunk, columns=columns)
+
+
+def _cell(value):
+    if hasattr(value, "item"):  # escalares do numpy
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def iter_csv(chunks):
+    for position, chunk in enumerate(chunks):
+        yield chunk.to_csv(index=False, header=position == 0).encode("utf-8")
+
+
+def write_csv(chunks, output):
+    for block in iter_csv(chunks):
+        output.write(block)
+
+
+def write_xlsx(chunks, output, sheet_name="Sheet1"):
+    from openpyxl import Workbook
+
+    # Modo write-only: as linhas vão direto para o XML da planilha, sem manter as células em memória
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    for position, chunk in enumerate(chunks):
+        if position == 0:
+            sheet.append(list(chunk.columns))
+        for row in chunk.itertuples(index=False, name=None):
+            sheet.append([_cell(value) for value in row])
+    workbook.save(output)
+
+
+def write_parquet(chunks, output):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(output, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+WRITERS = {"xlsx": write_xlsx, "csv": write_csv, "parquet": write_parquet}
+
+
+def export_data(data, export_format, chunk_size=EXPORT_CHUNK_SIZE, columns=None):
+    """Gera o arquivo no formato pedido, bloco a bloco, e devolve o arquivo posicionado no início."""
+    if export_format not in WRITERS:
+        raise ValueError(f"Formato de exportação inválido: {export_format}. Use um de {tuple(WRITERS)}.")
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    with tracer.span("export", format=export_format):
+        WRITERS[export_format](iter_chunks(data, chunk_size, columns), output)
+    output.seek(0)
+    return output
+
+
+def export_bytes(data, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Conteúdo do arquivo exportado em bytes, para o `st.download_button`.
+
+    O arquivo é gerado em blocos, mas o Streamlit precisa dele inteiro: o pico de memória aqui é o
+    tamanho do arquivo. Só o `GET /export` (stream_export) envia sem montar o arquivo em memória.
+    """
+    with export_data(data, export_format, chunk_size) as output:
+        return output.read()
+
+
+def stream_export(data, export_format, chunk_size=EXPORT_CHUNK_SIZE, block_size=64 * 1024, columns=None):
+    """Bytes do arquivo exportado para respostas HTTP; o CSV é enviado à medida que cada bloco é gerado."""
+    if export_format == "csv":
+        yield from iter_csv(iter_chunks(data, chunk_size, columns))
+        return
+    # XLSX e Parquet só ficam válidos ao final (zip e rodapé), então são gerados antes de enviar
+    output = export_data(data, export_format, chunk_size, columns)
+    try:
+        while block := output.read(block_size):
+            yield block
+    finally:
+        output.close()
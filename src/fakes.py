@@ -0,0 +1,135 @@
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class FakeGeminiChatModel(BaseChatModel):
+    """Modelo de chat determinístico para uso local, sem chamadas à API do Gemini."""
+
+    latency_seconds: float = 0.0
+    answer_words: int = 30
+
+    @property
+    def _llm_type(self):
+        return "fake-gemini"
+
+    def _answer(self, messages):
+        prompt = "\n".join(str(message.content) for message in messages)
+        words = prompt.split()
+        content = " ".join(words[-self.answer_words:]) if words else "Eu não sei"
+        usage = {
+            "input_tokens": len(words),
+            "output_tokens": min(len(words), self.answer_words),
+            "total_tokens": len(words) + min(len(words), self.answer_words),
+        }
+        return content, usage
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency_seconds)
+        content, usage = self._answer(messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content, usage_metadata=usage))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency_seconds)
+        content, usage = self._answer(messages)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content, usage_metadata=usage))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        content, usage = self._answer(messages)
+        words = content.split(" ")
+        for position, word in enumerate(words):
+            time.sleep(self.latency_seconds / max(1, len(words)))
+            last = position == len(words) - 1
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=word if last else f"{word} ",
+                    usage_metadata=usage if last else None,
+                )
+            )
+
+
+class HashEmbeddings(Embeddings):
+    """Embeddings determinísticos baseados em hash de tokens (bag of words normalizado)."""
+
+    def __init__(self, size=256, latency_seconds=0.0):
+        self.size = size
+        self.latency_seconds = latency_seconds
+
+    def _embed(self, text):
+        vector = np.zeros(self.size, dtype=np.float32)
+        for token in str(text).casefold().split():
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.size
+            vector[index] += 1.0 if digest[4] % 2 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency_seconds)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        time.sleep(self.latency_seconds)
+        return self._embed(text)
+
+
+# Diretórios temporários do Chroma criados pelos handlers falsos, apagados no encerramento do processo
+_directories = set()
+
+
+def discard_fake_handler(llm_handler):
+    """Apaga o diretório temporário do Chroma de um handler criado por `create_fake_handler`."""
+    directory = llm_handler.persist_directory
+    if directory in _directories:
+        _directories.discard(directory)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@atexit.register
+def _remove_directories():
+    for directory in list(_directories):
+        _directories.discard(directory)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def create_fake_handler(df=None, db_path="qa_database.json", latency_seconds=0.0, embedding_latency_seconds=0.0, **handler_kwargs):
+    """LLMHandler com modelo e embeddings locais, indexado com o DataFrame (ou o arquivo) informado."""
+    import pandas as pd
+
+    from functions.db_functions import update_vector_database
+    from src.context_packer import ContextPacker
+    from src.llm_handler import LLMHandler
+
+    directory = tempfile.mkdtemp(prefix="chatbot-fake-")
+    _directories.add(directory)
+    # Tokens contados por palavras, como no FakeGeminiChatModel, sem baixar o BPE do tiktoken
+    handler_kwargs.setdefault("embeddings", HashEmbeddings(latency_seconds=embedding_latency_seconds))
+    handler_kwargs.setdefault("context_packer", ContextPacker.from_env(token_counter=lambda text: len(text.split())))
+    llm_handler = LLMHandler(
+        api_key="fake",
+        llm=FakeGeminiChatModel(latency_seconds=latency_seconds),
+        persist_directory=directory,
+        **handler_kwargs,
+    )
+    if df is None:
+        with open(db_path, "r", encoding="utf-8") as f:
+            df = pd.DataFrame(json.load(f))
+    update_vector_database(
+        llm_handler.vectorstore,
+        df,
+        manifest_path=os.path.join(directory, "vector_manifest.sqlite3"),
+        lexical_index=llm_handler.lexical_index,
+        question_store=llm_handler.question_store,
+    )
+    return llm_handler
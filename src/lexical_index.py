@@ -0,0 +1,180 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter
+
+from langchain.schema import Document
+
+from src.response_cache import normalize_id
+
+LEXICAL_INDEX_PATH = os.path.join("chroma_db", "bm25_index.sqlite3")
+
+
+def normalize_text(text):
+    """Casefold e remoção de acentos, usado na busca lexical."""
+    decomposed = unicodedata.normalize("NFKD", str(text or "").casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    return [token for token in re.findall(r"\w+", normalize_text(text)) if len(token) > 1]
+
+
+class BM25Index:
+    """Índice BM25 em memória, persistido em SQLite: `save` grava só os documentos alterados desde a última gravação."""
+
+    def __init__(self, path=LEXICAL_INDEX_PATH, k1=1.5, b=0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.docs = {}
+        self.postings = {}
+        self.total_length = 0
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._connection = None
+        if path:
+            self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            with self._connection:
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute("CREATE TABLE IF NOT EXISTS docs (id TEXT PRIMARY KEY, doc TEXT NOT NULL)")
+            self.load()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def __contains__(self, unique_id):
+        return normalize_id(unique_id) in self.docs
+
+    def _add_postings(self, key, doc):
+        for term, frequency in doc["tf"].items():
+            self.postings.setdefault(term, {})[key] = frequency
+        self.total_length += doc["length"]
+
+    def _remove_postings(self, key):
+        doc = self.docs.pop(key, None)
+        if doc is None:
+            return False
+        for term in doc["tf"]:
+            postings = self.postings.get(term, {})
+            postings.pop(key, None)
+            if not postings:
+                self.postings.pop(term, None)
+        self.total_length -= doc["length"]
+        return True
+
+    def upsert(self, unique_id, question, answer, metadata):
+        key = normalize_id(unique_id)
+        tokens = tokenize(question) + tokenize(answer)
+        doc = {
+            "tf": dict(Counter(tokens)),
+            "length": len(tokens),
+            "page_content": answer,
+            "metadata": metadata,
+        }
+        with self._lock:
+            self._remove_postings(key)
+            self.docs[key] = doc
+            self._add_postings(key, doc)
+            self._dirty.add(key)
+
+    def remove(self, unique_id):
+        key = normalize_id(unique_id)
+        with self._lock:
+            removed = self._remove_postings(key)
+            if removed:
+                self._dirty.add(key)
+            return removed
+
+    @staticmethod
+    def _idf(document_frequency, total_docs):
+        return math.log(1 + (total_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def max_score(self, query):
+        """Pontuação de um documento de tamanho médio com uma ocorrência de cada termo conhecido da consulta.
+
+        Serve para normalizar a pontuação BM25 da busca: perto de 1.0, o documento cobre toda a consulta.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            total_docs = len(self.docs)
+            return sum(self._idf(len(self.postings[term]), total_docs) for term in terms if term in self.postings)
+
+    def search(self, query, k=5):
+        """Retorna até k pares (Document, score BM25) em ordem decrescente."""
+        terms = set(tokenize(query))
+        with self._lock:
+            total_docs = len(self.docs)
+            if not total_docs or not terms:
+                return []
+            average_length = self.total_length / total_docs
+            scores = Counter()
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = self._idf(len(postings), total_docs)
+                for key, frequency in postings.items():
+                    length_norm = 1 - self.b + self.b * self.docs[key]["length"] / average_length
+                    scores[key] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+            return [
+                (
+                    Document(
+                        page_content=self.docs[key]["page_content"],
+                        metadata=dict(self.docs[key]["metadata"]),
+                    ),
+                    score,
+                )
+                for key, score in scores.most_common(k)
+            ]
+
+    def load(self):
+        rows = self._connection.execute("SELECT id, doc FROM docs").fetchall()
+        with self._lock:
+            self.docs, self.postings, self.total_length = {}, {}, 0
+            self._dirty.clear()
+            for key, doc in rows:
+                self.docs[key] = json.loads(doc)
+                self._add_postings(key, self.docs[key])
+
+    def save(self):
+        if not self.path:
+            return
+        # Uma gravação por vez, para que uma versão mais antiga de um documento não sobrescreva a nova
+        with self._save_lock:
+            with self._lock:
+                changes = [
+                    (key, json.dumps(self.docs[key], ensure_ascii=False, default=str) if key in self.docs else None)
+                    for key in self._dirty
+                ]
+                self._dirty.clear()
+            try:
+                with self._connection:
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO docs (id, doc) VALUES (?, ?)",
+                        [(key, doc) for key, doc in changes if doc is not None],
+                    )
+                    self._connection.executemany(
+                        "DELETE FROM docs WHERE id = ?", [(key,) for key, doc in changes if doc is None]
+                    )
+            except Exception:
+                with self._lock:
+                    self._dirty.update(key for key, _ in changes)
+                raise
+
+
+def reciprocal_rank_fusion(result_lists, k=3, rank_constant=60):
+    """Combina listas de documentos ranqueados pelo ID da Pergunta e Resposta."""
+    scores = Counter()
+    documents = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results):
+            key = normalize_id(doc.metadata.get("ID"))
+            scores[key] += 1 / (rank_constant + rank + 1)
+            documents.setdefault(key, doc)
+    return [documents[key] for key, _ in scores.most_common(k)]
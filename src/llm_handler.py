@@ -1,27 +1,165 @@
-import streamlit as st
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+
 from chromadb.config import Settings
 from langchain.chains import ConversationChain, RetrievalQA
+from langchain.memory import ConversationBufferMemory
 from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
 from langchain_google_genai import (ChatGoogleGenerativeAI,
                                     GoogleGenerativeAIEmbeddings,
                                     HarmBlockThreshold, HarmCategory)
 
+from src.context_packer import ContextPacker
+from src.embedding_cache import CachedEmbeddings
+from src.lexical_index import BM25Index, reciprocal_rank_fusion
+from src.memory import BoundedSummaryMemory
+from src.response_cache import SemanticResponseCache, normalize_id
+from src.tracing import add_usage, tracer, usage_attributes
+
+RESPONSE_MODES = ("single_pass", "two_step")
+MEMORY_MODES = ("summary", "buffer")
+RETRIEVAL_MODES = ("hybrid", "vector", "lexical")
+
+SINGLE_PASS_PROMPT = """Você é um assistente especializado em responder perguntas. Utilize o contexto fornecido para responder com precisão. Se a resposta não estiver clara ou faltar informação, responda com 'Eu não sei'. Limite sua resposta a no máximo três frases, garantindo que seja clara e concisa.
+Perguntas básicas como Oi! Tudo bem?, bom dia, boa tarde, boa noite e etc devem ser respondidas normalmente!
+
+Histórico da conversa:
+{history}
+
+Contexto:
+{context}
+
+Pergunta: {question}
+
+Resposta:
+"""
+
+
+class HandlerRetriever(BaseRetriever):
+    handler: object
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return self.handler.retrieve_documents(query)
+
+    async def _aget_relevant_documents(self, query, *, run_manager=None):
+        return await self.handler.aretrieve_documents(query)
+
 
 class LLMHandler():
-    def __init__(self, api_key, model_name="gemini-1.5-pro"):
+    def __init__(self, api_key, model_name="gemini-1.5-pro", response_mode="single_pass", response_cache=None,
+                 retrieval_mode=None, lexical_index=None, lexical_shortcut_score=None,
+                 question_match_threshold=None, rephrase_curated=False, llm=None, embeddings=None,
+                 persist_directory="chroma_db", context_packer=None):
         self.api_key = api_key
         self.model_name = model_name
-        self.llm = ChatGoogleGenerativeAI(model=model_name, api_key=api_key, safety_settings={
+        self.response_mode = self._check_mode(response_mode)
+        self.persist_directory = persist_directory
+        self.llm = llm or self.create_llm(api_key)
+        self.embeddings = embeddings or CachedEmbeddings(self.create_embeddings(api_key))
+        self.vectorstore = self.create_vectorstore()
+        self.question_store = self.create_vectorstore(collection_name="chatbot-rh-perguntas")
+        self.question_match_threshold = (
+            question_match_threshold
+            if question_match_threshold is not None
+            else float(os.getenv("QUESTION_MATCH_THRESHOLD", "0.92"))
+        )
+        self.rephrase_curated = rephrase_curated
+        self.response_cache = response_cache or SemanticResponseCache()
+        self.retrieval_mode = retrieval_mode or os.getenv("RETRIEVAL_MODE", "hybrid")
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Modo de recuperação inválido: {self.retrieval_mode}. Use um de {RETRIEVAL_MODES}.")
+        self.lexical_index = (
+            lexical_index
+            if lexical_index is not None
+            else BM25Index(path=os.path.join(persist_directory, "bm25_index.sqlite3"))
+        )
+        # Pontuação BM25 normalizada pelo máximo da consulta (BM25Index.max_score); 1.0 = cobre a consulta toda
+        self.lexical_shortcut_score = (
+            lexical_shortcut_score
+            if lexical_shortcut_score is not None
+            else float(os.getenv("LEXICAL_SHORTCUT_SCORE", "1.0"))
+        )
+        self.context_packer = context_packer or ContextPacker.from_env()
+        if self.retrieval_mode != "vector" and not len(self.lexical_index):
+            self.rebuild_lexical_index()
+        # Sem a coleção de perguntas, cada Pergunta passaria pela API de embeddings na criação do handler:
+        # ela é indexada em segundo plano e, até terminar, a busca de pergunta curada é pulada
+        self.question_index_ready = threading.Event()
+        if not self.question_store._collection.count() and self.vectorstore._collection.count():
+            threading.Thread(target=self._backfill_question_index, name="question-index", daemon=True).start()
+        else:
+            self.question_index_ready.set()
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    def _get_loop(self):
+        # Um único event loop em segundo plano: o cliente assíncrono do Gemini fica preso ao loop onde foi criado
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-handler-loop", daemon=True).start()
+        return self._loop
+
+    def _run_sync(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()).result()
+
+    def run_on_loop(self, coroutine):
+        """Agenda a corrotina no loop do handler e devolve um awaitable para outro event loop."""
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self._get_loop()))
+
+    @staticmethod
+    def _check_mode(mode):
+        if mode not in RESPONSE_MODES:
+            raise ValueError(f"Modo de resposta inválido: {mode}. Use um de {RESPONSE_MODES}.")
+        return mode
+
+    def create_llm(self, api_key):
+        return ChatGoogleGenerativeAI(model=self.model_name, api_key=api_key, safety_settings={
             HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
         })
-        self.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=api_key)
-        self.vectorstore = self.create_vectorstore()
 
-    def create_vectorstore(self, directory="chroma_db", collection_name="chatbot-rh"):
+    @staticmethod
+    def create_embeddings(api_key):
+        return GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=api_key)
+
+    def update_api_key(self, api_key):
+        """Recria os clientes do Gemini com a nova chave; clientes injetados (ex.: fakes) são mantidos."""
+        if api_key == self.api_key:
+            return
+        self.api_key = api_key
+        if isinstance(self.llm, ChatGoogleGenerativeAI):
+            self.llm = self.create_llm(api_key)
+        # O CachedEmbeddings é mantido: o cache e as referências dos Chroma continuam válidos
+        if isinstance(self.embeddings, CachedEmbeddings) and isinstance(
+            self.embeddings.underlying, GoogleGenerativeAIEmbeddings
+        ):
+            self.embeddings.underlying = self.create_embeddings(api_key)
+
+    def create_vectorstore(self, directory=None, collection_name="chatbot-rh"):
+        directory = directory or self.persist_directory
         return Chroma(persist_directory=directory, embedding_function=self.embeddings, collection_name=collection_name, client_settings=Settings(
             persist_directory=directory, is_persistent=True
         ))
 
+    def create_memory(self, mode=None, max_token_limit=1500, max_turns=4):
+        mode = mode or os.getenv("MEMORY_MODE", "summary")
+        if mode not in MEMORY_MODES:
+            raise ValueError(f"Modo de memória inválido: {mode}. Use um de {MEMORY_MODES}.")
+        if mode == "buffer":
+            return ConversationBufferMemory(return_messages=True)
+        return BoundedSummaryMemory(
+            llm=self.llm,
+            max_token_limit=max_token_limit,
+            max_turns=max_turns,
+            return_messages=True,
+        )
+
     def create_conversation_chain(self, memory):
         return ConversationChain(llm=self.llm, verbose=True, memory=memory)
 
@@ -33,9 +171,222 @@ class LLMHandler():
             return_source_documents=True,
         )
 
-    def generate_response(self, prompt):
-        retriever = self.vectorstore.as_retriever(search_type="mmr", search_kwargs={"k": 3, "fetch_k": 5})
-        qa_response = self.create_retrieval_chain(retriever).invoke({"query": prompt})
+    def warm_up(self):
+        """Abre os índices HNSW das coleções e inicia o event loop, sem chamar a API do Gemini."""
+        self._get_loop()
+        for store in (self.vectorstore, self.question_store):
+            sample = store._collection.get(limit=1, include=["embeddings"])
+            if len(sample["embeddings"]):
+                store._collection.query(query_embeddings=[sample["embeddings"][0]], n_results=1)
+
+    def rebuild_lexical_index(self):
+        """Reconstrói o índice BM25 a partir dos documentos já gravados no Chroma."""
+        existing_docs = self.vectorstore.get(include=["metadatas", "documents"])
+        for metadata, doc in zip(existing_docs["metadatas"], existing_docs["documents"]):
+            self.lexical_index.upsert(metadata.get("ID"), metadata.get("Pergunta"), doc, metadata)
+        self.lexical_index.save()
+
+    def rebuild_question_index(self):
+        """Indexa as Perguntas já gravadas no Chroma, reaproveitando os ids das respostas."""
+        existing_docs = self.vectorstore.get(include=["metadatas", "documents"])
+        documents = [
+            Document(page_content=metadata["Pergunta"], metadata={**metadata, "Resposta": doc})
+            for metadata, doc in zip(existing_docs["metadatas"], existing_docs["documents"])
+        ]
+        for start in range(0, len(documents), 1000):
+            self.question_store.add_documents(
+                documents[start:start + 1000], ids=existing_docs["ids"][start:start + 1000]
+            )
+
+    def _backfill_question_index(self):
+        try:
+            with tracer.span("question_index_backfill"):
+                self.rebuild_question_index()
+        except Exception as e:
+            print(f"Erro ao indexar as Perguntas: {e}")
+        finally:
+            self.question_index_ready.set()
+
+    async def amatch_curated_question(self, prompt):
+        """Retorna a resposta curada cuja Pergunta é equivalente ao prompt, ou None."""
+        if self.question_match_threshold >= 1 or not self.question_index_ready.is_set():
+            return None
+        with tracer.span("question_match") as span:
+            results = await self.question_store.asimilarity_search_with_relevance_scores(prompt, k=1)
+            span["cache_hit"] = bool(results) and results[0][1] >= self.question_match_threshold
+            if not span["cache_hit"]:
+                return None
+            question_doc, score = results[0]
+            span["score"] = score
+        metadata = {key: value for key, value in question_doc.metadata.items() if key != "Resposta"}
+        return Document(page_content=question_doc.metadata["Resposta"], metadata=metadata)
+
+    def match_curated_question(self, prompt):
+        return self._run_sync(self.amatch_curated_question(prompt))
+
+    async def _acurated_response(self, prompt, curated_doc, usage=None):
+        if not self.rephrase_curated:
+            return curated_doc.page_content
+        return await self._ainvoke_llm(
+            "Reescreva a resposta abaixo de forma natural e cordial, sem alterar nem acrescentar informações.\n\n"
+            f"Pergunta: {prompt}\n\nResposta: {curated_doc.page_content}",
+            stage="curated_rephrase",
+            usage=usage,
+        )
+
+    def get_retriever(self):
+        return HandlerRetriever(handler=self)
+
+    def _is_confident_lexical(self, prompt, lexical_results):
+        """O melhor documento cobre a consulta e tem ao menos o dobro da pontuação do segundo."""
+        max_score = self.lexical_index.max_score(prompt)
+        if not lexical_results or not max_score or lexical_results[0][1] / max_score < self.lexical_shortcut_score:
+            return False
+        return len(lexical_results) == 1 or lexical_results[0][1] >= 2 * lexical_results[1][1]
+
+    @staticmethod
+    def _relative_scores(results):
+        """Pontuações divididas pela melhor da própria busca; sem melhor positiva, ficam sem pontuação."""
+        top_score = results[0][1] if results else 0
+        return [(doc, score / top_score if top_score > 0 else None) for doc, score in results]
+
+    async def aretrieve_documents(self, prompt, k=None, fetch_k=None):
+        """Recupera candidatos com pontuação e deixa o ContextPacker decidir o que entra no prompt."""
+        fetch_k = fetch_k or self.context_packer.fetch_k
+        with tracer.span("retrieval", mode=self.retrieval_mode) as span:
+            if self.retrieval_mode == "vector":
+                scored_docs = await self.vectorstore.asimilarity_search_with_relevance_scores(prompt, k=fetch_k)
+            else:
+                with tracer.span("lexical_search"):
+                    lexical_results = self.lexical_index.search(prompt, k=fetch_k)
+                # BM25 não tem escala fixa: normalizado pelo melhor resultado para o corte relativo
+                lexical_scored = self._relative_scores(lexical_results)
+
+                if self.retrieval_mode == "lexical":
+                    scored_docs = lexical_scored
+                elif self._is_confident_lexical(prompt, lexical_results):
+                    # Correspondência exata forte: dispensa a consulta ao Chroma (o embedding da
+                    # pergunta já foi calculado para o cache de respostas e fica no CachedEmbeddings)
+                    span["lexical_shortcut"] = True
+                    scored_docs = lexical_scored
+                else:
+                    vector_results = await self.vectorstore.asimilarity_search_with_relevance_scores(
+                        prompt, k=fetch_k
+                    )
+                    # Cada busca é normalizada na própria escala, para que o topo do BM25 (1.0) não
+                    # elimine os acertos vetoriais no corte relativo; vale a melhor das duas
+                    scores = {}
+                    for doc, score in lexical_scored + self._relative_scores(vector_results):
+                        doc_id = normalize_id(doc.metadata.get("ID"))
+                        previous = scores.get(doc_id, score)
+                        scores[doc_id] = None if score is None or previous is None else max(score, previous)
+                    fused = reciprocal_rank_fusion(
+                        [[doc for doc, _ in vector_results], [doc for doc, _ in lexical_results]], k=fetch_k
+                    )
+                    scored_docs = [(doc, scores.get(normalize_id(doc.metadata.get("ID")))) for doc in fused]
+            docs = self.context_packer.pack(scored_docs, k=k)
+            span["documents"] = len(docs)
+        return docs
+
+    def retrieve_documents(self, prompt, k=None, fetch_k=None):
+        return self._run_sync(self.aretrieve_documents(prompt, k=k, fetch_k=fetch_k))
+
+    async def _ainvoke_llm(self, llm_input, stage="generation", usage=None):
+        with tracer.span(stage) as span:
+            message = await self.llm.ainvoke(llm_input)
+            span.update(usage_attributes(message))
+        if usage is not None:
+            add_usage(usage, message)
+        return message.content
+
+    @staticmethod
+    def format_context(docs):
+        return "\n\n".join(doc.page_content for doc in docs)
+
+    @staticmethod
+    def format_history(memory):
+        if memory is None:
+            return ""
+        history = memory.load_memory_variables({}).get(memory.memory_key, "")
+        if isinstance(history, str):
+            return history
+        roles = {"human": "Usuário", "ai": "Assistente", "system": "Resumo"}
+        return "\n".join(f"{roles.get(message.type, message.type)}: {message.content}" for message in history)
+
+    def build_single_pass_prompt(self, prompt, docs, memory=None):
+        return SINGLE_PASS_PROMPT.format(
+            history=self.format_history(memory),
+            context=self.format_context(docs),
+            question=prompt,
+        )
+
+    async def _alookup_cache(self, prompt, memory):
+        query_embedding = await self.embeddings.aembed_query(prompt)
+        with tracer.span("response_cache") as span:
+            cached = self.response_cache.lookup(query_embedding)
+            span["cache_hit"] = cached is not None
+        if cached is not None:
+            await memory.asave_context({"input": prompt}, {"output": cached[0]})
+        return query_embedding, cached
+
+    def _store_cache(self, query_embedding, response, source_docs):
+        if query_embedding is not None:
+            self.response_cache.store(query_embedding, response, source_docs)
+
+    async def _aprepare_response(self, prompt, mode, memory, usage):
+        """Resolve cache e pergunta curada; caso contrário devolve a entrada pronta para o modelo."""
+        if isinstance(memory, BoundedSummaryMemory):
+            # Memórias criadas antes de uma troca de chave passam a resumir com o cliente atual
+            memory.llm = self.llm
+        # O cache é um só para todas as sessões e a resposta gerada depende do histórico: só perguntas
+        # sem histórico são consultadas e gravadas, para não levar respostas (nem dados) de uma conversa
+        # para outra. Nelas o embedding da pergunta é calculado aqui, antes do atalho lexical da recuperação
+        query_embedding = None
+        if not self.format_history(memory):
+            query_embedding, cached = await self._alookup_cache(prompt, memory)
+            if cached is not None:
+                return query_embedding, cached, None
+
+        if mode == "two_step":
+            curated_doc = await self.amatch_curated_question(prompt)
+            if curated_doc is None:
+                enhanced_prompt, source_docs = await self._aretrieve_two_step(prompt)
+                return query_embedding, None, (self._with_history(enhanced_prompt, memory), source_docs, "conversation_chain")
+        else:
+            # A busca da pergunta curada e a recuperação rodam em paralelo
+            curated_doc, source_docs = await asyncio.gather(
+                self.amatch_curated_question(prompt), self.aretrieve_documents(prompt)
+            )
+            if curated_doc is None:
+                llm_input = self.build_single_pass_prompt(prompt, source_docs, memory)
+                return query_embedding, None, (llm_input, source_docs, "generation")
+
+        response = await self._acurated_response(prompt, curated_doc, usage)
+        await memory.asave_context({"input": prompt}, {"output": response})
+        self._store_cache(query_embedding, response, [curated_doc])
+        return query_embedding, (response, [curated_doc]), None
+
+    async def agenerate_response(self, prompt, memory, mode=None, usage=None):
+        mode = self._check_mode(mode or self.response_mode)
+
+        with tracer.trace("chat_turn", mode=mode):
+            query_embedding, answered, pending = await self._aprepare_response(prompt, mode, memory, usage)
+            if answered is not None:
+                return answered
+
+            llm_input, source_docs, stage = pending
+            response = await self._ainvoke_llm(llm_input, stage=stage, usage=usage)
+            # Apenas a pergunta original vai para a memória, sem o contexto expandido
+            await memory.asave_context({"input": prompt}, {"output": response})
+            self._store_cache(query_embedding, response, source_docs)
+        return response, source_docs
+
+    def generate_response(self, prompt, memory, mode=None, usage=None):
+        return self._run_sync(self.agenerate_response(prompt, memory, mode=mode, usage=usage))
+
+    async def _aretrieve_two_step(self, prompt):
+        with tracer.span("retrieval_qa"):
+            qa_response = await self.create_retrieval_chain(self.get_retriever()).ainvoke({"query": prompt})
         retrieved_info = qa_response['result']
         source_docs = qa_response['source_documents']
 
@@ -48,15 +399,59 @@ class LLMHandler():
 
                             Resposta:
                             """
+        return enhanced_prompt, source_docs
 
-        response = self.create_conversation_chain(st.session_state.memory).predict(input=enhanced_prompt)
-        return response, source_docs
+    def _with_history(self, enhanced_prompt, memory):
+        history = self.format_history(memory)
+        return f"{history}\n\n{enhanced_prompt}" if history else enhanced_prompt
+
+    def generate_response_stream(self, prompt, memory, mode=None, usage=None):
+        """Retorna um gerador com os tokens da resposta e os documentos de origem."""
+        mode = self._check_mode(mode or self.response_mode)
+
+        with tracer.trace("chat_turn_setup", mode=mode) as turn:
+            query_embedding, answered, pending = self._run_sync(
+                self._aprepare_response(prompt, mode, memory, usage)
+            )
+        if answered is not None:
+            response, source_docs = answered
+            return iter([response]), source_docs
+
+        llm_input, source_docs, _ = pending
+
+        # A memória só é atualizada quando o gerador é consumido até o fim
+        def stream():
+            started = time.perf_counter()
+            chunks = []
+            message = None
+            with tracer.span("generation_stream", trace_id=turn["trace_id"]) as span:
+                for chunk in self.llm.stream(llm_input):
+                    message = chunk if message is None else message + chunk
+                    if chunk.content:
+                        if not chunks:
+                            span["first_token_ms"] = (time.perf_counter() - started) * 1000
+                        chunks.append(chunk.content)
+                        yield chunk.content
+                if message is not None:
+                    span.update(usage_attributes(message))
+                    if usage is not None:
+                        add_usage(usage, message)
+            response = "".join(chunks)
+            memory.save_context({"input": prompt}, {"output": response})
+            self._store_cache(query_embedding, response, source_docs)
+
+        return stream(), source_docs
+
+    async def agenerate_response_performance(self, prompt, mode=None):
+        mode = self._check_mode(mode or self.response_mode)
+        if mode == "single_pass":
+            source_docs = await self.aretrieve_documents(prompt)
+            return await self._ainvoke_llm(self.build_single_pass_prompt(prompt, source_docs))
 
-    def generate_response_performance(self, prompt):
-        retriever = self.vectorstore.as_retriever(search_type="mmr", search_kwargs={"k": 3, "fetch_k": 5})
-        qa_chain = self.create_retrieval_chain(retriever)
+        qa_chain = self.create_retrieval_chain(self.get_retriever())
 
-        qa_response = qa_chain({"query": prompt})
+        with tracer.span("retrieval_qa"):
+            qa_response = await qa_chain.ainvoke({"query": prompt})
         retrieved_info = qa_response['result']
 
         enhanced_prompt = f"""Based on the following information and the conversation history, please respond to the user's query:
@@ -68,12 +463,84 @@ class LLMHandler():
                             Please provide a comprehensive answer, incorporating the retrieved information if relevant.
                             """
 
-        response = self.llm.invoke(input=enhanced_prompt)
-        return response.content
+        return await self._ainvoke_llm(enhanced_prompt)
 
-    def test_performance(self, questions):
-        results = []
-        for question in questions:
-            response = self.generate_response_performance(question)
-            results.append(response)
+    def generate_response_performance(self, prompt, mode=None):
+        return self._run_sync(self.agenerate_response_performance(prompt, mode=mode))
+
+    @staticmethod
+    def _is_rate_limit(error):
+        message = f"{type(error).__name__} {error}".lower()
+        return "429" in message or "resourceexhausted" in message or "quota" in message or "rate limit" in message
+
+    async def _atimed_performance(self, question, mode, max_retries, backoff_seconds):
+        start = time.perf_counter()
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                with tracer.trace("performance_question", mode=mode, attempt=attempts):
+                    response = await self.agenerate_response_performance(question, mode=mode)
+                error = None
+                break
+            except Exception as e:
+                if attempts > max_retries or not self._is_rate_limit(e):
+                    response, error = None, str(e)
+                    break
+                # Backoff exponencial com jitter para respeitar a cota da API
+                await asyncio.sleep(backoff_seconds * 2 ** (attempts - 1) * (1 + random.random()))
+        return {
+            "question": question,
+            "response": response,
+            "error": error,
+            "attempts": attempts,
+            "seconds": time.perf_counter() - start,
+        }
+
+    async def arun_performance_batch(self, questions, mode=None, max_concurrency=4, max_retries=3, backoff_seconds=2.0, on_result=None):
+        """Executa as perguntas concorrentemente e devolve os resultados na ordem de entrada."""
+        mode = self._check_mode(mode or self.response_mode)
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(index, question):
+            async with semaphore:
+                return index, await self._atimed_performance(question, mode, max_retries, backoff_seconds)
+
+        results = [None] * len(questions)
+        tasks = [run(index, question) for index, question in enumerate(questions)]
+        for completed, task in enumerate(asyncio.as_completed(tasks), start=1):
+            index, result = await task
+            results[index] = result
+            if on_result:
+                on_result(completed, len(questions), index, result)
         return results
+
+    def run_performance_batch(self, questions, mode=None, max_workers=4, max_retries=3, backoff_seconds=2.0, on_result=None):
+        """Versão síncrona; o callback de progresso roda na thread de quem chamou (ex.: script do Streamlit)."""
+        progress = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(
+            self.arun_performance_batch(
+                questions,
+                mode=mode,
+                max_concurrency=max_workers,
+                max_retries=max_retries,
+                backoff_seconds=backoff_seconds,
+                on_result=lambda *args: progress.put(args),
+            ),
+            self._get_loop(),
+        )
+        while not future.done() or not progress.empty():
+            try:
+                args = progress.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if on_result:
+                on_result(*args)
+        return future.result()
+
+    async def atest_performance(self, questions, mode=None, max_concurrency=4):
+        results = await self.arun_performance_batch(questions, mode=mode, max_concurrency=max_concurrency)
+        return [result["response"] for result in results]
+
+    def test_performance(self, questions, mode=None, max_workers=4):
+        return self._run_sync(self.atest_performance(questions, mode=mode, max_concurrency=max_workers))
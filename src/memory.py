@@ -0,0 +1,52 @@
+from typing import Optional
+
+from langchain.memory import ConversationSummaryBufferMemory
+
+from src.tokens import count_tokens
+
+
+class BoundedSummaryMemory(ConversationSummaryBufferMemory):
+    """Mantém os últimos turnos literais e resume os anteriores de forma incremental.
+
+    Ao passar de `max_turns` turnos (ou do orçamento de tokens), o histórico é dobrado em lote até
+    `fold_to_turns` turnos (padrão: metade de `max_turns`) e metade do orçamento, para que o resumo
+    seja gerado só a cada alguns turnos e não a cada resposta.
+    """
+
+    max_turns: int = 4
+    fold_to_turns: Optional[int] = None
+
+    def _over_budget(self, buffer, max_turns, token_share=1.0):
+        if len(buffer) > 2 * max_turns:
+            return True
+        budget = (self.max_token_limit - count_tokens(self.moving_summary_buffer)) * token_share
+        return sum(count_tokens(message.content) for message in buffer) > budget
+
+    def _pop_pruned(self):
+        buffer = self.chat_memory.messages
+        pruned = []
+        if buffer and self._over_budget(buffer, self.max_turns):
+            fold_to_turns = self.max_turns // 2 if self.fold_to_turns is None else self.fold_to_turns
+            while buffer and self._over_budget(buffer, fold_to_turns, token_share=0.5):
+                pruned.append(buffer.pop(0))
+        return pruned
+
+    def _trim_summary(self):
+        # O resumo nunca ultrapassa o orçamento total, mesmo que o modelo o alongue
+        tokens = count_tokens(self.moving_summary_buffer)
+        if tokens > self.max_token_limit:
+            words = self.moving_summary_buffer.split()
+            keep = max(1, int(len(words) * self.max_token_limit / tokens))
+            self.moving_summary_buffer = " ".join(words[-keep:])
+
+    def prune(self):
+        pruned = self._pop_pruned()
+        if pruned:
+            self.moving_summary_buffer = self.predict_new_summary(pruned, self.moving_summary_buffer)
+            self._trim_summary()
+
+    async def aprune(self):
+        pruned = self._pop_pruned()
+        if pruned:
+            self.moving_summary_buffer = await self.apredict_new_summary(pruned, self.moving_summary_buffer)
+            self._trim_summary()
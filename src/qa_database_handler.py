@@ -1,25 +1,67 @@
-import json
+import os
 
 import pandas as pd
 import streamlit as st
 
-from functions.db_functions import initialize_db, update_vector_database
+from functions.db_functions import (delete_from_vector_database, initialize_db,
+                                    update_vector_database)
+from src.qa_filters import add_filter_columns
+from src.qa_storage import COLUMNS, create_storage
+from src.resources import get_llm_handler
 
 
 class QADatabaseHandler:
-    def __init__(self, db_path="qa_database.json"):
-        self.db_path = db_path
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.getenv("QA_DATABASE_PATH", "qa_database.json")
+        self.storage = create_storage(self.db_path)
 
     @st.cache_data
     def load_data(_self):
         try:
-            with open(_self.db_path, "r", encoding="utf-8") as f:
-                return pd.DataFrame(json.load(f))
+            return add_filter_columns(pd.DataFrame(_self.storage.load(), columns=COLUMNS))
         except FileNotFoundError:
             return "Arquivo não encontrado..."
 
-    def save_data(self, df):
-        with open(self.db_path, "w", encoding="utf-8") as f:
-            json.dump(df.to_dict("records"), f, ensure_ascii=False, indent=2)
-        db = initialize_db()
-        update_vector_database(db, df)
+    def _sync_vectors(self, df):
+        llm_handler = get_llm_handler()
+        changed_ids = update_vector_database(
+            initialize_db(),
+            df,
+            lexical_index=llm_handler.lexical_index,
+            question_store=llm_handler.question_store,
+        )
+        llm_handler.response_cache.invalidate(changed_ids)
+
+    def save_data(self, df, sync_vectors=True):
+        self.storage.save_all(df.to_dict("records"))
+        self.load_data.clear()
+        if sync_vectors:
+            self._sync_vectors(df)
+
+    def upsert_row(self, row, sync_vectors=True):
+        """Grava uma única Pergunta e Resposta e retorna o registro salvo (com ID)."""
+        record = self.storage.upsert(dict(row))
+        self.load_data.clear()
+        if sync_vectors:
+            self._sync_vectors(pd.DataFrame([record]))
+        return record
+
+    def upsert_rows(self, rows, sync_vectors=True):
+        """Grava um lote de Perguntas e Respostas (IDs ausentes são atribuídos pelo armazenamento) e sincroniza os vetores uma única vez."""
+        records = self.storage.upsert_many(rows)
+        self.load_data.clear()
+        if sync_vectors and records:
+            self._sync_vectors(pd.DataFrame(records))
+        return records
+
+    def delete_row(self, unique_id):
+        self.storage.delete(unique_id)
+        self.load_data.clear()
+        llm_handler = get_llm_handler()
+        removed_ids = delete_from_vector_database(
+            initialize_db(),
+            unique_id,
+            lexical_index=llm_handler.lexical_index,
+            question_store=llm_handler.question_store,
+        )
+        llm_handler.response_cache.invalidate(removed_ids)
@@ -0,0 +1,69 @@
+from collections import defaultdict
+
+import pandas as pd
+
+from src.lexical_index import normalize_text
+
+# Colunas derivadas, usadas só nos filtros; o armazenamento grava apenas COLUMNS
+FILTER_COLUMNS = ["_data", "_pergunta", "_status"]
+STATUS_CATEGORIES = ["Ativo", "Inativo"]
+
+
+def add_filter_columns(df, index=None):
+    """Calcula as colunas tipadas dos filtros para todas as linhas ou apenas para `index`."""
+    rows = df if index is None else df.loc[index]
+    dates = pd.to_datetime(rows["Data de criação"], format="%d/%m/%Y", errors="coerce")
+    questions = [normalize_text(question) for question in rows["Pergunta"]]
+    if index is None:
+        df["_data"] = dates
+        df["_pergunta"] = questions
+        df["_status"] = pd.Categorical(df["Status"], categories=STATUS_CATEGORIES)
+    else:
+        df.loc[index, "_data"] = dates
+        df.loc[index, "_pergunta"] = questions
+        df["_status"] = pd.Categorical(df["Status"], categories=STATUS_CATEGORIES)
+    return df
+
+
+def strip_filter_columns(df):
+    return df.drop(columns=FILTER_COLUMNS, errors="ignore")
+
+
+class QuestionNgramIndex:
+    """Índice de n-gramas das perguntas normalizadas, para busca por trecho sem varrer a base."""
+
+    def __init__(self, n=3):
+        self.n = n
+        self.postings = defaultdict(set)
+        self.texts = {}
+
+    @classmethod
+    def from_frame(cls, df, n=3):
+        index = cls(n)
+        for label, text in zip(df.index, df["_pergunta"]):
+            index.update(label, text)
+        return index
+
+    def _ngrams(self, text):
+        return {text[i : i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def update(self, label, text):
+        self.remove(label)
+        self.texts[label] = text
+        for gram in self._ngrams(text):
+            self.postings[gram].add(label)
+
+    def remove(self, label):
+        text = self.texts.pop(label, None)
+        if text is None:
+            return
+        for gram in self._ngrams(text):
+            self.postings[gram].discard(label)
+
+    def candidates(self, query):
+        """Linhas que contêm todos os n-gramas da consulta, ou None se ela for curta demais."""
+        grams = self._ngrams(normalize_text(query))
+        if not grams:
+            return None
+        postings = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        return set.intersection(*postings)
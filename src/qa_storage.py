@@ -0,0 +1,247 @@
+import argparse
+import json
+import math
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+COLUMNS = ["ID", "Pergunta", "Resposta", "Versão", "Status", "Data de criação"]
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+def _clean_record(record):
+    cleaned = {}
+    for column in COLUMNS:
+        value = record.get(column)
+        if hasattr(value, "item"):  # escalares do numpy/pandas
+            value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            value = None
+        elif isinstance(value, float) and value.is_integer() and column in ("ID", "Versão"):
+            value = int(value)
+        cleaned[column] = value
+    return cleaned
+
+
+def _iso_date(value):
+    try:
+        return datetime.strptime(value, "%d/%m/%Y").date().isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+class JSONStorage:
+    def __init__(self, path):
+        self.path = path
+
+    @contextmanager
+    def _locked(self):
+        with open(f"{self.path}.lock", "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, records):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def save_all(self, records):
+        with self._locked():
+            self._write([_clean_record(record) for record in records])
+
+    def upsert(self, record):
+        record = _clean_record(record)
+        with self._locked():
+            records = self.load() if os.path.exists(self.path) else []
+            if record["ID"] is None:
+                record["ID"] = max((r["ID"] for r in records if r.get("ID") is not None), default=0) + 1
+            for position, existing in enumerate(records):
+                if existing.get("ID") == record["ID"]:
+                    records[position] = record
+                    break
+            else:
+                records.append(record)
+            self._write(records)
+        return record
+
+    def upsert_many(self, records):
+        """Grava vários registros com uma única reescrita do arquivo; os sem ID recebem um sob o lock."""
+        records = [_clean_record(record) for record in records]
+        with self._locked():
+            existing = self.load() if os.path.exists(self.path) else []
+            positions = {record.get("ID"): position for position, record in enumerate(existing)}
+            next_id = max((r["ID"] for r in existing + records if r.get("ID") is not None), default=0) + 1
+            for record in records:
+                if record["ID"] is None:
+                    record["ID"] = next_id
+                    next_id += 1
+                if record["ID"] in positions:
+                    existing[positions[record["ID"]]] = record
+                else:
+                    positions[record["ID"]] = len(existing)
+                    existing.append(record)
+            self._write(existing)
+        return records
+
+    def iter_records(self, batch_size=1000):
+        yield from self.load()
+
+    def delete(self, unique_id):
+        with self._locked():
+            records = [r for r in self.load() if r.get("ID") != unique_id]
+            self._write(records)
+
+
+class SQLiteStorage:
+    UPSERT_SQL = """
+        INSERT INTO qa VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            pergunta = excluded.pergunta,
+            resposta = excluded.resposta,
+            versao = excluded.versao,
+            status = excluded.status,
+            data_criacao = excluded.data_criacao,
+            data_iso = excluded.data_iso
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS qa (
+                    id INTEGER PRIMARY KEY,
+                    pergunta TEXT,
+                    resposta TEXT,
+                    versao INTEGER,
+                    status TEXT,
+                    data_criacao TEXT,
+                    data_iso TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_qa_status ON qa (status);
+                CREATE INDEX IF NOT EXISTS idx_qa_data_iso ON qa (data_iso);
+                """
+            )
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA busy_timeout=30000")
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            yield connection
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _row(record):
+        return (
+            record["ID"],
+            record["Pergunta"],
+            record["Resposta"],
+            record["Versão"],
+            record["Status"],
+            record["Data de criação"],
+            _iso_date(record["Data de criação"]),
+        )
+
+    def load(self):
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT id, pergunta, resposta, versao, status, data_criacao FROM qa ORDER BY id"
+            ).fetchall()
+        finally:
+            connection.close()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def save_all(self, records):
+        rows = [self._row(_clean_record(record)) for record in records]
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM qa")
+            connection.executemany("INSERT INTO qa VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def upsert(self, record):
+        record = _clean_record(record)
+        with self._transaction() as connection:
+            cursor = connection.execute(self.UPSERT_SQL, self._row(record))
+            if record["ID"] is None:
+                record["ID"] = cursor.lastrowid
+        return record
+
+    def upsert_many(self, records):
+        """Grava vários registros em uma única transação; os sem ID recebem o próximo rowid."""
+        records = [_clean_record(record) for record in records]
+        with self._transaction() as connection:
+            connection.executemany(
+                self.UPSERT_SQL, [self._row(record) for record in records if record["ID"] is not None]
+            )
+            for record in records:
+                if record["ID"] is None:
+                    record["ID"] = connection.execute(self.UPSERT_SQL, self._row(record)).lastrowid
+        return records
+
+    def iter_records(self, batch_size=1000):
+        """Percorre a tabela em lotes, sem carregar todos os registros de uma vez."""
+        connection = self._connect()
+        try:
+            cursor = connection.execute(
+                "SELECT id, pergunta, resposta, versao, status, data_criacao FROM qa ORDER BY id"
+            )
+            while rows := cursor.fetchmany(batch_size):
+                for row in rows:
+                    yield dict(zip(COLUMNS, row))
+        finally:
+            connection.close()
+
+    def delete(self, unique_id):
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM qa WHERE id = ?", (unique_id,))
+
+
+def create_storage(path):
+    """Escolhe o backend de armazenamento pela extensão do arquivo."""
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        return SQLiteStorage(path)
+    return JSONStorage(path)
+
+
+def migrate_json_to_sqlite(json_path, sqlite_path):
+    """Copia todas as Perguntas e Respostas do arquivo JSON para o SQLite."""
+    records = JSONStorage(json_path).load()
+    SQLiteStorage(sqlite_path).save_all(records)
+    return len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra o qa_database.json para SQLite.")
+    parser.add_argument("json_path", nargs="?", default="qa_database.json")
+    parser.add_argument("sqlite_path", nargs="?", default="qa_database.sqlite3")
+    args = parser.parse_args()
+    total = migrate_json_to_sqlite(args.json_path, args.sqlite_path)
+    print(f"{total} registros migrados para {args.sqlite_path}.")
@@ -0,0 +1,37 @@
+import streamlit as st
+
+from src.secret_manager import get_secret
+from src.tracing import tracer
+
+# O LLMHandler (langchain, chromadb, Gemini) é importado sob demanda,
+# para que a página seja desenhada antes de carregar os módulos pesados.
+
+
+def get_api_key():
+    # Resolvido pelo cache de segredos do processo: só a primeira chamada (ou a renovação) vai à rede
+    api_key = get_secret("GEMINI_API_KEY")
+    if api_key is None:
+        raise ValueError(
+            "Não foi possível obter a chave API do Gemini. Verifique o Secret Manager ou o arquivo .env."
+        )
+    return api_key
+
+
+@st.cache_resource(show_spinner=False)
+def _create_llm_handler():
+    from src.llm_handler import LLMHandler
+
+    api_key = get_api_key()
+    with tracer.span("setup"):
+        return LLMHandler(api_key=api_key)
+
+
+def get_llm_handler():
+    # O handler fica em cache por processo; se o cache de segredos renovar a chave, os clientes são recriados
+    llm_handler = _create_llm_handler()
+    llm_handler.update_api_key(get_api_key())
+    return llm_handler
+
+
+def get_vectorstore():
+    return get_llm_handler().vectorstore
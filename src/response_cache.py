@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_id(value):
+    try:
+        return str(int(value))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+class SemanticResponseCache:
+    def __init__(self, threshold=0.95, max_entries=256, ttl_seconds=3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if entry["expires_at"] <= now]
+        for key in expired:
+            del self._entries[key]
+
+    def lookup(self, embedding):
+        """Retorna (resposta, documentos) da entrada mais similar ou None."""
+        query = self._normalize(embedding)
+        with self._lock:
+            self._purge_expired()
+            if self._entries:
+                keys = list(self._entries)
+                matrix = np.stack([self._entries[key]["embedding"] for key in keys])
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    key = keys[best]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    entry = self._entries[key]
+                    return entry["response"], entry["source_docs"]
+            self.misses += 1
+            return None
+
+    def store(self, embedding, response, source_docs):
+        with self._lock:
+            self._entries[self._next_key] = {
+                "embedding": self._normalize(embedding),
+                "response": response,
+                "source_docs": source_docs,
+                "doc_ids": {normalize_id(doc.metadata.get("ID")) for doc in source_docs},
+                "expires_at": time.monotonic() + self.ttl_seconds,
+            }
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, ids):
+        """Remove as respostas que usaram algum dos IDs informados como contexto."""
+        ids = {normalize_id(value) for value in ids}
+        if not ids:
+            return 0
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry["doc_ids"] & ids]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
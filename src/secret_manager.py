@@ -1,7 +1,22 @@
 import os
+import threading
+import time
 
 from dotenv import load_dotenv
 
+from src.tracing import tracer
+
+_dotenv_lock = threading.Lock()
+_dotenv_loaded = False
+
+
+def _load_dotenv_once():
+    global _dotenv_loaded
+    with _dotenv_lock:
+        if not _dotenv_loaded:
+            load_dotenv()
+            _dotenv_loaded = True
+
 
 class SecretManager:
     def __init__(self, project, client):
@@ -19,5 +34,113 @@ class SecretManager:
 
     @staticmethod
     def load_from_env(key):
-        load_dotenv()
+        _load_dotenv_once()
         return os.getenv(key)
+
+
+class SecretCache:
+    """Cache de segredos por processo, com TTL e renovação em segundo plano.
+
+    Um único cliente do Secret Manager é criado sob demanda. Perto de expirar (`refresh_margin` do TTL),
+    o valor continua sendo servido enquanto uma thread busca o novo; se a busca falhar, o valor antigo
+    é mantido. Sem Secret Manager (ou sem o segredo lá), usa as variáveis de ambiente / .env.
+    """
+
+    def __init__(self, ttl_seconds=3600, refresh_margin=0.2, manager_factory=None):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self._manager_factory = manager_factory or self._default_manager
+        self._manager = None
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+
+    @staticmethod
+    def _default_manager():
+        import google.auth
+        from google.cloud import secretmanager
+
+        credentials, project = google.auth.default()
+        client = secretmanager.SecretManagerServiceClient(credentials=credentials)
+        return SecretManager(project=project, client=client)
+
+    def _get_manager(self):
+        with self._lock:
+            if self._manager is None:
+                try:
+                    self._manager = self._manager_factory()
+                except Exception as e:
+                    print(f"Secret Manager indisponível, usando variáveis de ambiente: {e}")
+                    self._manager = False
+            return self._manager
+
+    def _fetch(self, secret_id, version_id):
+        manager = self._get_manager()
+        value = None
+        if manager:
+            with tracer.span("secret_manager", secret=secret_id):
+                value = manager.access_secret_version(secret_id, version_id)
+            if value is None:
+                print(f"{secret_id} não encontrado no Secret Manager. Tentando carregar do .env...")
+        if value is None:
+            value = SecretManager.load_from_env(secret_id)
+        return value
+
+    def _store(self, key, value):
+        now = time.monotonic()
+        self._entries[key] = {
+            "value": value,
+            "refresh_at": now + self.ttl_seconds * (1 - self.refresh_margin),
+            "expires_at": now + self.ttl_seconds,
+        }
+
+    def _refresh(self, key):
+        try:
+            value = self._fetch(*key)
+            if value is not None:
+                with self._lock:
+                    self._store(key, value)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, secret_id, version_id="latest"):
+        key = (secret_id, version_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now < entry["expires_at"]:
+                if now >= entry["refresh_at"] and key not in self._refreshing:
+                    self._refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+                return entry["value"]
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+
+        # Uma única busca por segredo; as demais chamadas esperam e usam o resultado
+        with fetch_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and time.monotonic() < entry["expires_at"]:
+                    return entry["value"]
+            value = self._fetch(secret_id, version_id)
+            with self._lock:
+                if value is not None:
+                    self._store(key, value)
+                elif entry:
+                    value = entry["value"]
+            return value
+
+    def invalidate(self, secret_id=None):
+        with self._lock:
+            if secret_id is None:
+                self._entries.clear()
+            else:
+                self._entries = {key: entry for key, entry in self._entries.items() if key[0] != secret_id}
+
+
+secret_cache = SecretCache(ttl_seconds=float(os.getenv("SECRET_CACHE_TTL", "3600")))
+
+
+def get_secret(secret_id, version_id="latest"):
+    return secret_cache.get(secret_id, version_id)
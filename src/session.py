@@ -0,0 +1,51 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ChatSession:
+    session_id: str
+    memory: object
+    last_access: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+
+class SessionStore:
+    """Guarda as memórias de conversa por session_id, com expiração e limite de sessões."""
+
+    def __init__(self, memory_factory, ttl_seconds=3600, max_sessions=1000):
+        self.memory_factory = memory_factory
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id=None):
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, session in self._sessions.items() if now - session.last_access > self.ttl_seconds]
+            for key in expired:
+                del self._sessions[key]
+
+            session_id = session_id or uuid.uuid4().hex
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = ChatSession(session_id=session_id, memory=self.memory_factory())
+                self._sessions[session_id] = session
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        return len(self._sessions)
@@ -0,0 +1,14 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name="cl100k_base"):
+    # Importado aqui para não pesar no tempo de inicialização das páginas
+    import tiktoken
+
+    return tiktoken.get_encoding(name)
+
+
+def count_tokens(text):
+    """Conta tokens localmente (aproximação do tokenizador do Gemini)."""
+    return len(get_encoding().encode(text or "", disallowed_special=()))
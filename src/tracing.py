@@ -0,0 +1,120 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+
+logger = logging.getLogger("chatbot.tracing")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_current_trace = ContextVar("current_trace", default=None)
+
+
+def usage_attributes(message):
+    """Extrai a contagem de tokens informada pelo Gemini em uma resposta."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    return {
+        "input_tokens": usage.get("input_tokens"),
+        "output_tokens": usage.get("output_tokens"),
+    }
+
+
+def add_usage(totals, message):
+    """Soma ao dicionário `totals` os tokens de uma resposta (um turno pode ter mais de uma chamada)."""
+    for key, value in usage_attributes(message).items():
+        if value is not None:
+            totals[key] = (totals.get(key) or 0) + value
+
+
+class Tracer:
+    def __init__(self, max_records=5000, log_enabled=None):
+        self.records = deque(maxlen=max_records)
+        self.log_enabled = (
+            os.getenv("TRACE_LOG", "1") != "0" if log_enabled is None else log_enabled
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current_trace_id():
+        return _current_trace.get()
+
+    @contextmanager
+    def trace(self, name, **attributes):
+        """Agrupa as etapas de uma mesma requisição sob um trace_id."""
+        trace_id = uuid.uuid4().hex
+        token = _current_trace.set(trace_id)
+        try:
+            with self.span(name, trace_id=trace_id, **attributes) as record:
+                yield record
+        finally:
+            _current_trace.reset(token)
+
+    @contextmanager
+    def span(self, stage, trace_id=None, **attributes):
+        record = {"stage": stage, "trace_id": trace_id or _current_trace.get(), **attributes}
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["duration_ms"] = (time.perf_counter() - start) * 1000
+            record["timestamp"] = time.time()
+            self._emit(record)
+
+    def _emit(self, record):
+        with self._lock:
+            self.records.append(record)
+        if self.log_enabled:
+            # Formato JSON reconhecido pelo Cloud Logging
+            logger.info(json.dumps(
+                {"severity": "ERROR" if "error" in record else "INFO",
+                 "message": f"etapa {record['stage']}", **record},
+                ensure_ascii=False,
+                default=str,
+            ))
+
+    def summary(self):
+        """Resumo por etapa com p50/p95 de latência, tokens e acertos de cache."""
+        with self._lock:
+            records = list(self.records)
+
+        stages = {}
+        for record in records:
+            stages.setdefault(record["stage"], []).append(record)
+
+        rows = []
+        for stage, items in stages.items():
+            durations = np.array([item["duration_ms"] for item in items])
+            cache_flags = [item["cache_hit"] for item in items if item.get("cache_hit") is not None]
+            rows.append({
+                "etapa": stage,
+                "chamadas": len(items),
+                "p50_ms": float(np.percentile(durations, 50)),
+                "p95_ms": float(np.percentile(durations, 95)),
+                "erros": sum(1 for item in items if "error" in item),
+                "tokens_entrada": sum(item.get("input_tokens") or 0 for item in items),
+                "tokens_saida": sum(item.get("output_tokens") or 0 for item in items),
+                "taxa_cache": sum(cache_flags) / len(cache_flags) if cache_flags else None,
+            })
+        return sorted(rows, key=lambda row: row["etapa"])
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+
+tracer = Tracer()
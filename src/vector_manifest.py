@@ -0,0 +1,71 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class VectorManifest:
+    """Manifesto ID -> (id no Chroma, hash, versão) em SQLite, lido e gravado por linha.
+
+    `locked()` serializa as sincronizações, entre threads e processos: a leitura do manifesto, as
+    alterações no Chroma e a gravação das linhas afetadas acontecem sem outra sincronização no meio.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS manifest (id TEXT PRIMARY KEY, chroma_id TEXT, hash TEXT, version)"
+            )
+
+    @contextmanager
+    def locked(self):
+        with self._lock, open(f"{self.path}.lock", "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield self
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM manifest").fetchone()[0]
+
+    def get_many(self, keys):
+        entries = {}
+        keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT id, chroma_id, hash, version FROM manifest WHERE id IN ({placeholders})", batch
+                ).fetchall()
+                for key, chroma_id, row_hash, version in rows:
+                    entries[key] = {"chroma_id": chroma_id, "hash": row_hash, "version": version}
+        return entries
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def apply(self, entries=None, removed=()):
+        """Grava as entradas novas ou alteradas e remove as chaves indicadas, em uma transação."""
+        with self._lock:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO manifest (id, chroma_id, hash, version) VALUES (?, ?, ?, ?)",
+                    [
+                        (key, entry["chroma_id"], entry["hash"], entry["version"])
+                        for key, entry in (entries or {}).items()
+                    ],
+                )
+                self._connection.executemany("DELETE FROM manifest WHERE id = ?", [(key,) for key in removed])
@@ -0,0 +1,122 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+
+from src.tracing import tracer
+
+# Módulos pesados, na ordem em que a página de chat precisa deles
+STARTUP_MODULES = [
+    "streamlit",
+    "numpy",
+    "google.cloud.secretmanager",
+    "chromadb",
+    "langchain",
+    "langchain_google_genai",
+    "src.llm_handler",
+    "tiktoken",
+    "pandas",
+    "openpyxl",
+]
+
+def warm_up(get_llm_handler=None):
+    """Carrega o BPE do tiktoken, cria o LLMHandler e abre o Chroma; devolve a duração de cada etapa.
+
+    Cada etapa é independente: uma falha (ex.: sem rede para o BPE) é registrada e as demais seguem.
+    """
+    from src.tokens import get_encoding
+
+    if get_llm_handler is None:
+        from src.resources import get_llm_handler
+
+    timings = {}
+    with tracer.trace("warmup"):
+        for step, function in (
+            ("tokenizer", get_encoding),
+            ("llm_handler", get_llm_handler),
+            ("vector_store", lambda: get_llm_handler().warm_up()),
+        ):
+            start = time.perf_counter()
+            try:
+                with tracer.span("warmup", step=step):
+                    function()
+            except Exception as e:
+                print(f"Erro no aquecimento ({step}): {e}")
+                continue
+            timings[step] = time.perf_counter() - start
+    return timings
+
+
+def build_indexes(get_llm_handler=None):
+    """Cria o handler e espera a indexação das Perguntas no Chroma; devolve o total indexado.
+
+    Rodado antes do build da imagem (`python -m src.warmup --build-indexes`), grava a coleção
+    chatbot-rh-perguntas em chroma_db/, e as instâncias novas não precisam gerá-la na partida.
+    """
+    if get_llm_handler is None:
+        from src.resources import get_llm_handler
+
+    llm_handler = get_llm_handler()
+    llm_handler.question_index_ready.wait()
+    return llm_handler.question_store._collection.count()
+
+
+def serve_streamlit(script="Main.py", streamlit_args=()):
+    """Aquece o processo e só então inicia o servidor do Streamlit, no mesmo processo.
+
+    O Streamlit só executa o script quando uma sessão se conecta; aquecendo antes de abrir a porta, o
+    LLMHandler já está no `st.cache_resource` quando a primeira sessão chega, e a sonda de inicialização
+    do Cloud Run só libera tráfego depois disso. WARMUP_ON_START=0 inicia o servidor sem aquecer.
+    """
+    from streamlit.web import cli as stcli
+
+    if os.getenv("WARMUP_ON_START", "1") != "0":
+        print_profile("Aquecimento:", warm_up())
+    sys.argv = ["streamlit", "run", script, *streamlit_args]
+    sys.exit(stcli.main())
+
+
+def profile_imports(modules=STARTUP_MODULES):
+    """Tempo de importação de cada módulo, na ordem dada (o que já foi carregado não é contado de novo)."""
+    timings = {}
+    for module in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"Não foi possível importar {module}: {e}")
+            continue
+        timings[module] = time.perf_counter() - start
+    return timings
+
+
+def print_profile(title, timings):
+    print(title)
+    for name, seconds in timings.items():
+        print(f"  {name:<32}{seconds * 1000:>10.1f} ms")
+    print(f"  {'total':<32}{sum(timings.values()) * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Relatório de tempo de inicialização ou início do servidor aquecido.")
+    parser.add_argument("--imports-only", action="store_true", help="Mede só as importações, sem aquecimento.")
+    parser.add_argument(
+        "--serve", action="store_true",
+        help="Aquece e inicia o Streamlit com Main.py; os demais argumentos vão para o `streamlit run`.",
+    )
+    parser.add_argument(
+        "--build-indexes", action="store_true", help="Indexa as Perguntas no Chroma (chroma_db/) e sai.",
+    )
+    args, streamlit_args = parser.parse_known_args()
+
+    if args.build_indexes:
+        print(f"{build_indexes()} Perguntas indexadas em chatbot-rh-perguntas.")
+        sys.exit(0)
+    if args.serve:
+        serve_streamlit(streamlit_args=streamlit_args)
+    elif streamlit_args:
+        parser.error(f"Argumentos não reconhecidos: {' '.join(streamlit_args)}")
+    print_profile("Importações:", profile_imports())
+    if not args.imports_only:
+        print_profile("Aquecimento:", warm_up())
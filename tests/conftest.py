@@ -0,0 +1,71 @@
+import os
+
+# Antes de importar o tracer: sem log de spans durante os testes
+os.environ.setdefault("TRACE_LOG", "0")
+
+import pandas as pd
+import pytest
+
+import src.tokens
+from src.fakes import create_fake_handler, discard_fake_handler
+
+RECORDS = [
+    {
+        "ID": 1,
+        "Pergunta": "Como funciona o vale refeição?",
+        "Resposta": "O vale refeição é creditado todo dia 5 no cartão do colaborador.",
+        "Versão": 1,
+        "Status": "Ativo",
+        "Data de criação": "01/02/2024",
+    },
+    {
+        "ID": 2,
+        "Pergunta": "Qual o Linkedin da BlueShift?",
+        "Resposta": "Linkedin: https://www.linkedin.com/company/blueshift-brasil",
+        "Versão": 1,
+        "Status": "Ativo",
+        "Data de criação": "15/03/2024",
+    },
+    {
+        "ID": 3,
+        "Pergunta": "Como registrar horas adicionais?",
+        "Resposta": "As horas adicionais são registradas no Portal do Fornecedor após aprovação do gestor.",
+        "Versão": 2,
+        "Status": "Ativo",
+        "Data de criação": "20/05/2024",
+    },
+    {
+        "ID": 4,
+        "Pergunta": "Qual o prazo do reembolso antigo?",
+        "Resposta": "Política descontinuada.",
+        "Versão": 1,
+        "Status": "Inativo",
+        "Data de criação": "10/01/2023",
+    },
+]
+
+
+class WordEncoding:
+    """Conta tokens por palavras, sem baixar o BPE do tiktoken."""
+
+    @staticmethod
+    def encode(text, **kwargs):
+        return text.split()
+
+
+@pytest.fixture(autouse=True)
+def local_environment(monkeypatch):
+    monkeypatch.setattr(src.tokens, "get_encoding", lambda name="cl100k_base": WordEncoding())
+    monkeypatch.setenv("WARMUP_ON_START", "0")
+
+
+@pytest.fixture
+def qa_df():
+    return pd.DataFrame(RECORDS)
+
+
+@pytest.fixture
+def fake_handler(qa_df):
+    handler = create_fake_handler(df=qa_df)
+    yield handler
+    discard_fake_handler(handler)
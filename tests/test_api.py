@@ -0,0 +1,77 @@
+import csv
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.http_app import create_app
+from src.qa_storage import COLUMNS, JSONStorage
+
+from tests.conftest import RECORDS
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = JSONStorage(str(tmp_path / "qa.json"))
+    storage.save_all(RECORDS)
+    return storage
+
+
+@pytest.fixture
+def client(fake_handler, storage):
+    return TestClient(create_app(fake_handler, storage=storage))
+
+
+def test_health(client):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok", "sessions": 0}
+
+
+def test_chat_keeps_the_session(client):
+    first = client.post("/chat", json={"question": "Como funciona o vale refeição?"}).json()
+    assert first["answer"]
+    assert first["sources"][0]["ID"] == 1
+
+    second = client.post(
+        "/chat", json={"question": "E quando ele é creditado?", "session_id": first["session_id"], "mode": "two_step"}
+    ).json()
+    assert second["session_id"] == first["session_id"]
+    assert second["usage"]["output_tokens"] > 0
+    assert client.get("/health").json()["sessions"] == 1
+
+    assert client.delete(f"/sessions/{first['session_id']}").json() == {"deleted": True}
+    assert client.get("/health").json()["sessions"] == 0
+
+
+def test_chat_rejects_unknown_mode(client):
+    response = client.post("/chat", json={"question": "Oi", "mode": "three_step"})
+    assert response.status_code == 422
+
+
+def test_chat_batch(client):
+    items = [{"question": "Qual o Linkedin da BlueShift?"}, {"question": "Como registrar horas adicionais?"}]
+    results = client.post("/chat/batch", json={"items": items, "max_concurrency": 2}).json()["results"]
+    assert len(results) == 2
+    assert all("error" not in result and result["answer"] for result in results)
+    assert client.post("/chat/batch", json={"items": []}).status_code == 422
+
+
+def test_export_csv(client):
+    response = client.get("/export/csv")
+    assert response.status_code == 200
+    assert 'filename="qa_database.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert [int(row["ID"]) for row in rows] == [record["ID"] for record in RECORDS]
+
+
+def test_export_empty_database_keeps_header(fake_handler, tmp_path):
+    storage = JSONStorage(str(tmp_path / "empty.json"))
+    storage.save_all([])
+    client = TestClient(create_app(fake_handler, storage=storage))
+    content = client.get("/export/csv").content.decode("utf-8-sig")
+    assert content.strip().split(",") == COLUMNS
+
+
+def test_export_unknown_format(client):
+    assert client.get("/export/pdf").status_code == 404
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from src.bulk_import import validate_chunk
+from src.qa_storage import COLUMNS
+
+
+def test_validate_chunk_normalizes_columns_and_defaults():
+    chunk = pd.DataFrame({
+        "pergunta": [" Como pedir férias? "],
+        "RESPOSTA": ["Pelo portal."],
+        "data_de_criacao": ["2024-03-01"],
+    })
+    valid, errors = validate_chunk(chunk)
+    assert errors == []
+    assert list(valid.columns) == COLUMNS
+    row = valid.iloc[0]
+    assert row["Pergunta"] == "Como pedir férias?"
+    assert row["Status"] == "Ativo" and row["Versão"] == 1
+    assert row["Data de criação"] == "01/03/2024"
+
+
+def test_validate_chunk_reports_lines():
+    chunk = pd.DataFrame({
+        "Pergunta": ["Ok?", "", "Status?", "Data?"],
+        "Resposta": ["Sim.", "Sem pergunta.", "Errado.", "Errada."],
+        "Status": ["inativo", "Ativo", "Pendente", ""],
+        "Data de criação": ["", "", "", "31/02/2024"],
+    })
+    valid, errors = validate_chunk(chunk, first_line=10)
+    assert valid["Pergunta"].tolist() == ["Ok?"]
+    assert valid["Status"].tolist() == ["Inativo"]
+    assert errors == [
+        {"Linha": 11, "Erro": "Pergunta vazia"},
+        {"Linha": 12, "Erro": "Status inválido"},
+        {"Linha": 13, "Erro": "Data de criação inválida"},
+    ]
+
+
+def test_validate_chunk_requires_question_and_answer():
+    with pytest.raises(ValueError, match="Resposta"):
+        validate_chunk(pd.DataFrame({"Pergunta": ["Sem resposta?"]}))
@@ -0,0 +1,66 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from functions.function_app import _lcs_length, _rouge_l, _token_f1, evaluate_responses
+from src.fakes import HashEmbeddings
+
+
+def naive_lcs(reference, generated):
+    table = [[0] * (len(generated) + 1) for _ in range(len(reference) + 1)]
+    for i, ref_token in enumerate(reference):
+        for j, gen_token in enumerate(generated):
+            table[i + 1][j + 1] = table[i][j] + 1 if ref_token == gen_token else max(table[i][j + 1], table[i + 1][j])
+    return table[-1][-1]
+
+
+def naive_f1(reference, generated):
+    overlap = sum((Counter(reference) & Counter(generated)).values())
+    total = len(reference) + len(generated)
+    return 2 * overlap / total if total else 0.0
+
+
+def random_pairs(count=200, seed=3):
+    rng = random.Random(seed)
+    vocabulary = ["ferias", "horas", "portal", "gestor", "vale", "dia", "cliente", "registro"]
+    return [
+        ([rng.choice(vocabulary) for _ in range(rng.randint(0, 80))], [rng.choice(vocabulary) for _ in range(rng.randint(0, 80))])
+        for _ in range(count)
+    ]
+
+
+def test_lcs_length_matches_dynamic_programming():
+    assert _lcs_length(list("ABCBDAB"), list("BDCABA")) == 4
+    for reference, generated in random_pairs():
+        assert _lcs_length(reference, generated) == naive_lcs(reference, generated)
+
+
+def test_token_f1_matches_counter_overlap():
+    pairs = random_pairs()
+    scores = _token_f1([reference for reference, _ in pairs], [generated for _, generated in pairs])
+    np.testing.assert_allclose(scores, [naive_f1(reference, generated) for reference, generated in pairs])
+
+
+def test_rouge_l_of_identical_and_empty_texts():
+    np.testing.assert_allclose(_rouge_l([["a", "b"], []], [["a", "b"], []]), [1.0, 0.0])
+
+
+def test_evaluate_responses_labels():
+    references = ["O vale refeição é creditado no dia 5", "Registre as horas no portal", None]
+    generated = ["O vale refeição é creditado no dia 5", "Fale com o RH sobre férias", "qualquer"]
+    result = evaluate_responses(references, generated, metric="f1")
+    assert result["Validação"].tolist() == ["Correto", "Incorreto", "Erro"]
+    assert result.loc[0, "F1"] == 1.0
+
+    semantic = evaluate_responses(references, generated, embeddings=HashEmbeddings())
+    assert semantic.loc[0, "Similaridade"] == pytest.approx(1.0)
+    assert semantic["Validação"].tolist()[0] == "Correto"
+
+
+def test_evaluate_responses_requires_embeddings_for_semantic():
+    with pytest.raises(ValueError):
+        evaluate_responses(["a"], ["a"])
+    with pytest.raises(ValueError):
+        evaluate_responses(["a"], ["a"], metric="bleu")
@@ -0,0 +1,67 @@
+from langchain.schema import Document
+
+from src.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+from tests.conftest import RECORDS
+
+
+def build_index(path=None):
+    index = BM25Index(path=path)
+    for record in RECORDS:
+        index.upsert(record["ID"], record["Pergunta"], record["Resposta"], {"ID": record["ID"]})
+    return index
+
+
+def test_tokenize_removes_accents_and_short_tokens():
+    assert tokenize("Férias e Horas Adicionais!") == ["ferias", "horas", "adicionais"]
+
+
+def test_search_ranks_matching_document_first():
+    index = build_index()
+    results = index.search("linkedin", k=2)
+    assert results[0][0].metadata["ID"] == 2
+    assert len(results) == 1
+    # Sem acento na consulta, o documento acentuado é encontrado
+    assert index.search("refeicao", k=1)[0][0].metadata["ID"] == 1
+
+
+def test_search_without_known_terms_is_empty():
+    index = build_index()
+    assert index.search("xyzzy") == []
+    assert index.max_score("xyzzy") == 0
+
+
+def test_max_score_bounds_the_normalized_score():
+    index = build_index()
+    document, score = index.search("horas adicionais", k=1)[0]
+    assert document.metadata["ID"] == 3
+    assert 0 < score / index.max_score("horas adicionais") < 2
+
+
+def test_remove_and_reinsert():
+    index = build_index()
+    assert index.remove(2) and 2 not in index
+    assert not index.remove(2)
+    assert index.search("linkedin") == []
+    index.upsert(2, "Linkedin", "Novo link", {"ID": 2})
+    assert index.search("linkedin", k=1)[0][0].page_content == "Novo link"
+
+
+def test_save_persists_only_changes(tmp_path):
+    path = str(tmp_path / "bm25.sqlite3")
+    index = build_index(path)
+    index.save()
+    index.remove(4)
+    index.upsert(1, "Vale alimentação", "Creditado no dia 10.", {"ID": 1})
+    index.save()
+
+    reloaded = BM25Index(path=path)
+    assert len(reloaded) == 3 and 4 not in reloaded
+    assert reloaded.search("alimentacao", k=1)[0][0].metadata["ID"] == 1
+    assert reloaded.search("linkedin", k=1)[0][0].metadata["ID"] == 2
+
+
+def test_reciprocal_rank_fusion_prefers_documents_in_both_lists():
+    docs = {key: Document(page_content=key, metadata={"ID": key}) for key in ("1", "2", "3")}
+    fused = reciprocal_rank_fusion([[docs["1"], docs["2"]], [docs["2"], docs["3"]]], k=2)
+    assert [doc.metadata["ID"] for doc in fused] == ["2", "1"]
@@ -0,0 +1,73 @@
+import math
+
+import pytest
+
+from src.qa_storage import JSONStorage, SQLiteStorage, create_storage, migrate_json_to_sqlite
+
+from tests.conftest import RECORDS
+
+
+@pytest.fixture(params=["qa.json", "qa.sqlite3"])
+def storage(request, tmp_path):
+    storage = create_storage(str(tmp_path / request.param))
+    storage.save_all(RECORDS)
+    return storage
+
+
+def test_create_storage_by_extension(tmp_path):
+    assert isinstance(create_storage(str(tmp_path / "qa.json")), JSONStorage)
+    assert isinstance(create_storage(str(tmp_path / "qa.db")), SQLiteStorage)
+    assert isinstance(create_storage(str(tmp_path / "qa.SQLITE3")), SQLiteStorage)
+
+
+def test_save_all_and_load(storage):
+    assert storage.load() == RECORDS
+    assert list(storage.iter_records(batch_size=2)) == RECORDS
+
+
+def test_upsert_replaces_existing(storage):
+    storage.upsert({**RECORDS[0], "Resposta": "Nova resposta", "Versão": 2})
+    records = {record["ID"]: record for record in storage.load()}
+    assert len(records) == len(RECORDS)
+    assert records[1]["Resposta"] == "Nova resposta"
+    assert records[1]["Versão"] == 2
+
+
+def test_upsert_without_id_gets_next_id(storage):
+    saved = storage.upsert({**RECORDS[0], "ID": None, "Pergunta": "Nova pergunta"})
+    assert saved["ID"] == 5
+    assert storage.load()[-1]["Pergunta"] == "Nova pergunta"
+
+
+def test_upsert_many_assigns_ids_and_keeps_explicit_ones(storage):
+    saved = storage.upsert_many([
+        {**RECORDS[0], "ID": None, "Pergunta": "Primeira nova"},
+        {**RECORDS[1], "Resposta": "Editada"},
+        {**RECORDS[0], "ID": float("nan"), "Pergunta": "Segunda nova"},
+    ])
+    assert [record["ID"] for record in saved] == [5, 2, 6]
+    records = {record["ID"]: record for record in storage.load()}
+    assert len(records) == 6
+    assert records[2]["Resposta"] == "Editada"
+    assert records[6]["Pergunta"] == "Segunda nova"
+
+
+def test_clean_record_converts_nan_and_float_ids(storage):
+    storage.upsert({**RECORDS[0], "ID": 7.0, "Versão": 3.0, "Data de criação": math.nan})
+    record = storage.load()[-1]
+    assert record["ID"] == 7 and isinstance(record["ID"], int)
+    assert record["Versão"] == 3
+    assert record["Data de criação"] is None
+
+
+def test_delete(storage):
+    storage.delete(2)
+    assert [record["ID"] for record in storage.load()] == [1, 3, 4]
+
+
+def test_migrate_json_to_sqlite(tmp_path):
+    json_path = str(tmp_path / "qa.json")
+    sqlite_path = str(tmp_path / "qa.sqlite3")
+    JSONStorage(json_path).save_all(RECORDS)
+    assert migrate_json_to_sqlite(json_path, sqlite_path) == len(RECORDS)
+    assert SQLiteStorage(sqlite_path).load() == RECORDS
@@ -0,0 +1,52 @@
+import time
+
+from src.secret_manager import SecretCache
+
+
+class FakeManager:
+    def __init__(self, values):
+        self.values = values
+        self.calls = 0
+
+    def access_secret_version(self, secret_id, version_id="latest"):
+        self.calls += 1
+        return self.values.get(secret_id)
+
+
+def test_get_caches_the_value():
+    manager = FakeManager({"GEMINI_API_KEY": "chave-1"})
+    cache = SecretCache(manager_factory=lambda: manager)
+    assert cache.get("GEMINI_API_KEY") == "chave-1"
+    assert cache.get("GEMINI_API_KEY") == "chave-1"
+    assert manager.calls == 1
+
+    manager.values["GEMINI_API_KEY"] = "chave-2"
+    cache.invalidate("GEMINI_API_KEY")
+    assert cache.get("GEMINI_API_KEY") == "chave-2"
+    assert manager.calls == 2
+
+
+def test_falls_back_to_environment(monkeypatch):
+    monkeypatch.setenv("SOMENTE_NO_ENV", "valor-env")
+
+    def unavailable():
+        raise RuntimeError("sem credenciais")
+
+    assert SecretCache(manager_factory=unavailable).get("SOMENTE_NO_ENV") == "valor-env"
+    assert SecretCache(manager_factory=lambda: FakeManager({})).get("SOMENTE_NO_ENV") == "valor-env"
+
+
+def test_refreshes_in_background_before_expiring():
+    manager = FakeManager({"TOKEN": "antigo"})
+    cache = SecretCache(ttl_seconds=5, refresh_margin=0.99, manager_factory=lambda: manager)
+    assert cache.get("TOKEN") == "antigo"
+    manager.values["TOKEN"] = "novo"
+    time.sleep(0.1)
+
+    # Dentro da margem de renovação o valor atual é servido enquanto a thread busca o novo
+    assert cache.get("TOKEN") == "antigo"
+    deadline = time.monotonic() + 2
+    while cache.get("TOKEN") != "novo" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get("TOKEN") == "novo"
+    assert manager.calls == 2
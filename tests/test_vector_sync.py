@@ -0,0 +1,92 @@
+import os
+
+from functions.db_functions import delete_from_vector_database, load_manifest, update_vector_database
+from src.vector_manifest import VectorManifest
+
+
+def manifest_path(handler):
+    return os.path.join(handler.persist_directory, "vector_manifest.sqlite3")
+
+
+def sync(handler, df):
+    return update_vector_database(
+        handler.vectorstore,
+        df,
+        manifest_path=manifest_path(handler),
+        lexical_index=handler.lexical_index,
+        question_store=handler.question_store,
+    )
+
+
+def stored_ids(store):
+    return sorted(metadata["ID"] for metadata in store.get(include=["metadatas"])["metadatas"])
+
+
+def test_vector_manifest_apply_and_get(tmp_path):
+    manifest = VectorManifest(str(tmp_path / "manifest.sqlite3"))
+    with manifest.locked():
+        manifest.apply({"1": {"chroma_id": "a", "hash": "h1", "version": 1}, "2": {"chroma_id": "b", "hash": "h2", "version": 3}})
+        manifest.apply({"2": {"chroma_id": "c", "hash": "h3", "version": 4}}, removed=["1"])
+    assert len(manifest) == 1
+    assert manifest.get("1") is None
+    assert manifest.get_many(["2", "2", "9"]) == {"2": {"chroma_id": "c", "hash": "h3", "version": 4}}
+
+
+def test_initial_sync_indexes_only_active_rows(fake_handler):
+    manifest = load_manifest(fake_handler.vectorstore, manifest_path(fake_handler))
+    assert len(manifest) == 3
+    assert stored_ids(fake_handler.vectorstore) == [1, 2, 3]
+    assert stored_ids(fake_handler.question_store) == [1, 2, 3]
+    assert len(fake_handler.lexical_index) == 3 and 4 not in fake_handler.lexical_index
+
+
+def test_resync_without_changes_is_noop(fake_handler, qa_df):
+    assert sync(fake_handler, qa_df) == set()
+
+
+def test_edited_row_replaces_its_document(fake_handler, qa_df):
+    manifest = load_manifest(fake_handler.vectorstore, manifest_path(fake_handler))
+    before = manifest.get("1")
+    qa_df.loc[qa_df["ID"] == 1, ["Resposta", "Versão"]] = ["O vale refeição passou para o dia 10.", 2]
+
+    assert sync(fake_handler, qa_df) == {"1"}
+    after = manifest.get("1")
+    assert after["chroma_id"] != before["chroma_id"] and after["version"] == 2
+    assert stored_ids(fake_handler.vectorstore) == [1, 2, 3]
+    assert stored_ids(fake_handler.question_store) == [1, 2, 3]
+    doc = fake_handler.vectorstore.get(ids=[after["chroma_id"]])["documents"][0]
+    assert doc == "O vale refeição passou para o dia 10."
+    assert fake_handler.lexical_index.search("dia 10", k=1)[0][0].metadata["ID"] == 1
+
+
+def test_inactivated_row_is_removed(fake_handler, qa_df):
+    qa_df.loc[qa_df["ID"] == 2, "Status"] = "Inativo"
+
+    assert sync(fake_handler, qa_df) == {"2"}
+    assert stored_ids(fake_handler.vectorstore) == [1, 3]
+    assert stored_ids(fake_handler.question_store) == [1, 3]
+    assert load_manifest(fake_handler.vectorstore, manifest_path(fake_handler)).get("2") is None
+    assert 2 not in fake_handler.lexical_index
+
+
+def test_delete_from_vector_database(fake_handler):
+    removed = delete_from_vector_database(
+        fake_handler.vectorstore,
+        3,
+        manifest_path=manifest_path(fake_handler),
+        lexical_index=fake_handler.lexical_index,
+        question_store=fake_handler.question_store,
+    )
+    assert removed == {"3"}
+    assert stored_ids(fake_handler.vectorstore) == [1, 2]
+    assert stored_ids(fake_handler.question_store) == [1, 2]
+    assert 3 not in fake_handler.lexical_index
+
+
+def test_manifest_bootstraps_from_chroma(fake_handler, qa_df):
+    # Um manifesto novo é criado a partir do Chroma, com os mesmos hashes: nada precisa ser reindexado
+    path = os.path.join(fake_handler.persist_directory, "bootstrap_manifest.sqlite3")
+    original = load_manifest(fake_handler.vectorstore, manifest_path(fake_handler))
+    manifest = load_manifest(fake_handler.vectorstore, path)
+    assert manifest.get_many(["1", "2", "3"]) == original.get_many(["1", "2", "3"])
+    assert update_vector_database(fake_handler.vectorstore, qa_df, manifest_path=path) == set()
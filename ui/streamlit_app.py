@@ -1,51 +1,30 @@
 import json
+import os
 from datetime import datetime
 
-import google.auth
 import streamlit as st
-import tiktoken
-from google.cloud import secretmanager
-from langchain.memory import ConversationBufferMemory
 
 from src.feedback_handler import FeedbackManager
-from src.llm_handler import LLMHandler
-from src.secret_manager import SecretManager
+from src.resources import get_llm_handler
+from src.tokens import count_tokens
 
 llm_handler = None
-qa_chain = None
 
+# Origem do contador de tokens: "local" conta todas as mensagens com o tiktoken; "gemini" soma os tokens
+# de entrada e saída informados pelo Gemini (respostas do cache ou curadas, sem chamada ao modelo, contam 0)
+TOKEN_COUNT_SOURCES = ("local", "gemini")
+TOKEN_COUNT_SOURCE = os.getenv("TOKEN_COUNT_SOURCE", "local")
+if TOKEN_COUNT_SOURCE not in TOKEN_COUNT_SOURCES:
+    raise ValueError(f"Origem de contagem de tokens inválida: {TOKEN_COUNT_SOURCE}. Use uma de {TOKEN_COUNT_SOURCES}.")
 
-def initialize_app():
-    global llm_handler, qa_chain
-
-    credentials, project = google.auth.default()
-    client = secretmanager.SecretManagerServiceClient(credentials=credentials)
-    secret_manager = SecretManager(project=project, client=client)
-    api_key = secret_manager.access_secret_version("GEMINI_API_KEY")
-
-    if api_key is None:
-        print(
-            "Chave API não encontrada no Secret Manager. Tentando carregar do .env..."
-        )
-        api_key = secret_manager.load_from_env("GEMINI_API_KEY")
 
-    if api_key is None:
-        raise ValueError(
-            "Não foi possível obter a chave API do Gemini. Verifique o Secret Manager ou o arquivo .env."
-        )
+def initialize_app():
+    global llm_handler
 
-    llm_handler = LLMHandler(api_key=api_key)
-    vectorstore = llm_handler.create_vectorstore()
+    llm_handler = get_llm_handler()
 
     if "memory" not in st.session_state:
-        st.session_state.memory = ConversationBufferMemory(return_messages=True)
-
-    conversation = llm_handler.create_conversation_chain(memory=st.session_state.memory)
-    retriever = vectorstore.as_retriever(
-        search_type="mmr", search_kwargs={"k": 3, "fetch_k": 5}
-    )
-
-    qa_chain = llm_handler.create_retrieval_chain(retriever)
+        st.session_state.memory = llm_handler.create_memory()
 
 
 def run_streamlit_app():
@@ -75,16 +54,26 @@ def main():
 
     # Input do usuário e geração de resposta
     if prompt := st.chat_input("Como posso ajudar você?"):
-        st.session_state["messages"].append({"role": "user", "content": prompt})
+        st.session_state["messages"].append(
+            {"role": "user", "content": prompt, "tokens": count_tokens(prompt) if TOKEN_COUNT_SOURCE == "local" else 0}
+        )
         with st.chat_message("user"):
             st.markdown(prompt)
 
         with st.chat_message("assistant"):
-            full_response, source_docs = llm_handler.generate_response(prompt)
-            st.markdown(full_response)
+            usage = {}
+            stream, source_docs = llm_handler.generate_response_stream(
+                prompt, st.session_state.memory, usage=usage
+            )
+            full_response = st.write_stream(stream)
 
+        if TOKEN_COUNT_SOURCE == "local":
+            tokens = count_tokens(full_response)
+        else:
+            # No modo Gemini, o turno inteiro (prompt com contexto e resposta) fica na mensagem do assistente
+            tokens = (usage.get("input_tokens") or 0) + (usage.get("output_tokens") or 0)
         st.session_state["messages"].append(
-            {"role": "assistant", "content": full_response}
+            {"role": "assistant", "content": full_response, "tokens": tokens}
         )
 
         feedback_manager = FeedbackManager()
@@ -121,16 +110,16 @@ def main():
         with col2:
             if st.button("🧹"):
                 st.session_state["messages"] = []
+                st.session_state.memory.clear()
                 del st.session_state["conversation_id"]
                 st.rerun()
 
         with col3:
-            enc = tiktoken.get_encoding("cl100k_base")
-            tokenized_full_text = enc.encode(
-                " ".join([item["content"] for item in st.session_state["messages"]])
-            )
-            label = f"💬 {len(tokenized_full_text)} tokens"
-            st.link_button(label, "https://platform.openai.com/tokenizer")
+            total_tokens = sum(item.get("tokens") or 0 for item in st.session_state["messages"])
+            if TOKEN_COUNT_SOURCE == "local":
+                st.link_button(f"💬 {total_tokens} tokens", "https://platform.openai.com/tokenizer")
+            else:
+                st.button(f"💬 {total_tokens} tokens (Gemini)", disabled=True)
 
 
 if __name__ == "__main__":